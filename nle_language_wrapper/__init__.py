@@ -1 +1,4 @@
+from nle_language_wrapper.wrappers.async_wrapper import AsyncNLELanguageWrapper
 from nle_language_wrapper.wrappers.nle_language_wrapper import NLELanguageWrapper
+from nle_language_wrapper.wrappers.nle_language_wrapper import make_nle_env
+from nle_language_wrapper.wrappers.vector_env import NLELanguageVectorEnv
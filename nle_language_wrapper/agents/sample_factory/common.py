@@ -1,5 +1,6 @@
 from sample_factory.algorithms.utils.arguments import arg_parser
 from sample_factory.algorithms.utils.arguments import parse_args
+from sample_factory.utils.utils import str2bool
 
 
 def custom_parse_args(argv=None, evaluation=False):
@@ -33,6 +34,13 @@ def custom_parse_args(argv=None, evaluation=False):
         default=256,
         help="Maximum token input length before truncation",
     )
+    parser.add_argument(
+        "--prioritize_glyphs",
+        type=str2bool,
+        default=False,
+        help="Fit the glyph description into max_token_length by dropping its "
+        "least relevant lines instead of truncating the text from the left",
+    )
 
     cfg = parse_args(argv=argv, evaluation=evaluation, parser=parser)
     return cfg
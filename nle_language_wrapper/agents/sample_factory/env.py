@@ -30,37 +30,103 @@ class SampleFactoryNLELanguageEnv(gym.Env):
         self.tokenizer = RobertaTokenizerFast.from_pretrained(
             "distilroberta-base", truncation_side="left"
         )
+        # text_glyphs is assembled from a closed set of phrases, tokenize them
+        # once and let the translator write the glyph token ids directly.
+        nle_language = self.env.nle_language
+        phrases = [phrase.decode("latin-1") for phrase in nle_language.glyph_phrases()]
+        nle_language.set_phrase_tokens(
+            self.tokenizer(phrases, add_special_tokens=False)["input_ids"]
+        )
+        self.glyph_input_ids = np.zeros(self.cfg["max_token_length"], dtype=np.int32)
 
-    # We use caching to avoid re-tokenizing observations that are already seen.
     @lru_cache(maxsize=LRU_CACHE_SIZE)
-    def _tokenize(self, str_obsv):
-        tokens = self.tokenizer(
-            str_obsv,
-            return_tensors="pt",
-            padding="max_length",
-            truncation=True,
-            max_length=self.cfg["max_token_length"],
+    def _token_ids(self, text):
+        return np.array(
+            self.tokenizer(text, add_special_tokens=False)["input_ids"], dtype=np.int32
         )
+
+    # We use caching to avoid re-tokenizing observations that are already seen.
+    @lru_cache(maxsize=LRU_CACHE_SIZE)
+    def _tokenize(self, text_prefix, glyph_input_ids, text_suffix):
+        if glyph_input_ids:
+            # The text before and after the glyphs ends and starts on a newline
+            # so tokenizing the parts separately gives the same tokens.
+            token_ids = np.concatenate(
+                [
+                    self._token_ids(text_prefix),
+                    np.frombuffer(glyph_input_ids, dtype=np.int32),
+                    self._token_ids(text_suffix),
+                ]
+            )
+        else:
+            # Without glyphs the newlines around them merge into one token.
+            token_ids = self._token_ids(text_prefix + text_suffix)
+        # Left truncation and padding to max_length as done by the tokenizer.
+        max_length = self.cfg["max_token_length"]
+        token_ids = token_ids[max(0, len(token_ids) - max_length + 2) :]
+        token_count = len(token_ids) + 2
+        input_ids = np.full((1, max_length), self.tokenizer.pad_token_id, np.int32)
+        input_ids[0, 0] = self.tokenizer.cls_token_id
+        input_ids[0, 1 : token_count - 1] = token_ids
+        input_ids[0, token_count - 1] = self.tokenizer.sep_token_id
+        attention_mask = np.zeros((1, max_length), dtype=np.int32)
+        attention_mask[0, :token_count] = 1
         # Sample factory insists on normalizing obs key.
-        tokens.data["obs"] = torch.zeros(1)
-        return tokens.data
-
-    def _convert_obsv_to_str(self, obsv):
-        text_obsv = ""
-        text_obsv += f"Inventory:\n{obsv['text_inventory']}\n\n"
-        text_obsv += f"Stats:\n{obsv['text_blstats']}\n\n"
-        text_obsv += f"Cursor:\n{obsv['text_cursor']}\n\n"
-        text_obsv += f"Stats:\n{obsv['text_glyphs']}\n\n"
-        text_obsv += f"Message:\n{obsv['text_message']}"
-        return text_obsv
+        return {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "obs": torch.zeros(1),
+        }
+
+    def _tokenize_nle_obsv(self, nle_obsv):
+        nle_language = self.env.nle_language
+        text_inventory = nle_language.text_inventory(
+            nle_obsv["inv_strs"], nle_obsv["inv_letters"]
+        )
+        text_blstats = nle_language.text_blstats(nle_obsv["blstats"])
+        text_cursor = nle_language.text_cursor(
+            nle_obsv["glyphs"], nle_obsv["blstats"], nle_obsv["tty_cursor"]
+        )
+        text_message = nle_language.text_message(nle_obsv["tty_chars"])
+        text_prefix = ""
+        text_prefix += f"Inventory:\n{text_inventory}\n\n"
+        text_prefix += f"Stats:\n{text_blstats}\n\n"
+        text_prefix += f"Cursor:\n{text_cursor}\n\n"
+        text_prefix += "Stats:\n"
+        text_suffix = f"\n\nMessage:\n{text_message}"
+        max_tokens = None
+        if self.cfg["prioritize_glyphs"]:
+            # Keep the other texts whole and only the glyph lines that fit,
+            # instead of truncating the inventory from the left.
+            other_count = len(self._token_ids(text_prefix)) + len(
+                self._token_ids(text_suffix)
+            )
+            max_tokens = max(0, self.cfg["max_token_length"] - other_count - 2)
+        glyph_count = nle_language.token_glyphs(
+            nle_obsv["glyphs"],
+            nle_obsv["blstats"],
+            self.glyph_input_ids,
+            max_tokens=max_tokens,
+        )
+        if glyph_count > len(self.glyph_input_ids):
+            self.glyph_input_ids = np.zeros(glyph_count, dtype=np.int32)
+            nle_language.token_glyphs(
+                nle_obsv["glyphs"],
+                nle_obsv["blstats"],
+                self.glyph_input_ids,
+                max_tokens=max_tokens,
+            )
+        return self._tokenize(
+            text_prefix, self.glyph_input_ids[:glyph_count].tobytes(), text_suffix
+        )
 
     def reset(self, **kwargs):
-        return self._tokenize(self._convert_obsv_to_str(self.env.reset(**kwargs)))
+        self.env.pre_reset()
+        return self._tokenize_nle_obsv(self.nle_env.reset(**kwargs))
 
     def step(self, action):
-        obsv, reward, done, info = self.env.step(action)
-        tokenized_obsv = self._tokenize(self._convert_obsv_to_str(obsv))
-        return tokenized_obsv, reward, done, info
+        nle_obsv, reward, done, info = self.nle_env.step(action)
+        return self._tokenize_nle_obsv(nle_obsv), reward, done, info
 
     def seed(self, *args):  # pylint: disable=['unused-argument']
         # Nethack does not allow seeding
@@ -0,0 +1,357 @@
+import argparse
+import asyncio
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import gym
+import nle  # pylint: disable=unused-import
+import numpy as np
+from nle import nethack
+
+from nle_language_wrapper import AsyncNLELanguageWrapper
+from nle_language_wrapper import NLELanguageVectorEnv
+from nle_language_wrapper import NLELanguageWrapper
+from nle_language_wrapper import make_nle_env
+from nle_language_wrapper.nle_language_obsv import NLELanguageObsv
+
+# Argument order of NLELanguageObsv.text_all.
+NLE_OBSV_KEYS = "glyphs blstats tty_cursor inv_strs inv_letters tty_chars".split()
+
+# Actions chosen by the fake language model of the async benchmark.
+FAKE_MODEL_ACTIONS = ["north", "east", "south", "west", "search", "wait"]
+
+
+def record_trajectory(nle_env_name, steps, seed=0):
+    """Record the raw observations of an agent taking random actions.
+    Args:
+        nle_env_name (str): name of the NLE environment to record
+        steps (int): number of observations to record
+        seed (int): seed for the random actions
+    Returns:
+        (List[dict]): raw NLE observations
+    """
+    env = gym.make(nle_env_name)
+    rng = np.random.default_rng(seed)
+    nle_obsv = env.reset()
+    trajectory = []
+    while len(trajectory) < steps:
+        trajectory.append({key: nle_obsv[key].copy() for key in NLE_OBSV_KEYS})
+        nle_obsv, _, done, _ = env.step(rng.integers(len(env.actions)))
+        if done:
+            nle_obsv = env.reset()
+    env.close()
+    return trajectory
+
+
+def translate(nle_language, nle_obsv):
+    return nle_language.text_all(*[nle_obsv[key] for key in NLE_OBSV_KEYS])
+
+
+def translate_threaded(executor, nle_language, trajectory):
+    return list(executor.map(partial(translate, nle_language), trajectory))
+
+
+def benchmark_threads(trajectory, thread_counts=(1, 4, 8), repeat=5):
+    """Translate a trajectory from several python threads sharing one
+    translator, translation releases the GIL so this scales with cores.
+    Args:
+        trajectory (List[dict]): raw NLE observations
+        thread_counts (Tuple[int]): python thread counts to compare
+        repeat (int): number of timing repeats, the fastest is reported
+    Returns:
+        (dict): translations per second for each thread count
+    """
+    nle_language = NLELanguageObsv()
+    results = {}
+    for num_threads in thread_counts:
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            run = partial(translate_threaded, executor, nle_language, trajectory)
+            runtime = min(timeit.repeat(run, number=1, repeat=repeat))
+        results[num_threads] = len(trajectory) / runtime
+    return results
+
+
+def busy_levels(trajectory, count, num_items=400, seed=0):
+    """Fill a room sized like the whole map with random objects and monsters,
+    as seen in shops, zoos and graveyards, the worst case for text_glyphs.
+    Args:
+        trajectory (List[dict]): raw NLE observations to take the rest from
+        count (int): number of levels to generate
+        num_items (int): number of objects and monsters on each level
+        seed (int): seed for the random placement
+    Returns:
+        (List[dict]): raw NLE observations
+    """
+    # pylint: disable=no-member
+    rng = np.random.default_rng(seed)
+    room = nethack.GLYPH_CMAP_OFF + 19  # S_room
+    levels = []
+    for i in range(count):
+        nle_obsv = dict(trajectory[i % len(trajectory)])
+        glyphs = np.full(nethack.DUNGEON_SHAPE, room, dtype=np.int16)
+        positions = rng.integers((0, 0), nethack.DUNGEON_SHAPE, (num_items, 2))
+        monsters = rng.integers(nethack.GLYPH_MON_OFF, nethack.GLYPH_PET_OFF, num_items)
+        objects = rng.integers(nethack.GLYPH_OBJ_OFF, nethack.GLYPH_CMAP_OFF, num_items)
+        items = np.where(rng.random(num_items) < 0.5, monsters, objects)
+        glyphs[positions[:, 0], positions[:, 1]] = items
+        nle_obsv["glyphs"] = glyphs
+        levels.append(nle_obsv)
+    return levels
+
+
+def benchmark_glyphs(levels, repeat=5):
+    """Time text_glyphs on each observation.
+    Args:
+        levels (dict): name to a list of raw NLE observations
+        repeat (int): number of timing repeats, the fastest is reported
+    Returns:
+        (dict): text_glyphs calls per second for each list of observations
+    """
+    nle_language = NLELanguageObsv()
+    results = {}
+    for name, trajectory in levels.items():
+        arguments = [
+            (nle_obsv["glyphs"], nle_obsv["blstats"]) for nle_obsv in trajectory
+        ]
+
+        def run(arguments=arguments):
+            for glyphs, blstats in arguments:
+                nle_language.text_glyphs(glyphs, blstats)
+
+        runtime = min(timeit.repeat(run, number=1, repeat=repeat))
+        results[name] = len(trajectory) / runtime
+    return results
+
+
+def benchmark_blstats(trajectory, repeat=5):
+    """Time text_blstats on a trajectory and on a single repeated observation,
+    e.g. while searching or waiting.
+    Args:
+        trajectory (List[dict]): raw NLE observations
+        repeat (int): number of timing repeats, the fastest is reported
+    Returns:
+        (dict): text_blstats calls per second
+    """
+    nle_language = NLELanguageObsv()
+    results = {}
+    for name, blstats in [
+        ("trajectory", [nle_obsv["blstats"] for nle_obsv in trajectory]),
+        ("repeated", [trajectory[0]["blstats"]] * len(trajectory)),
+    ]:
+
+        def run(blstats=blstats):
+            for nle_blstats in blstats:
+                nle_language.text_blstats(nle_blstats)
+
+        runtime = min(timeit.repeat(run, number=1, repeat=repeat))
+        results[name] = len(blstats) / runtime
+    return results
+
+
+def benchmark_message(trajectory, repeat=5):
+    """Time text_message on a trajectory and on its menus and multipage
+    messages only.
+    Args:
+        trajectory (List[dict]): raw NLE observations
+        repeat (int): number of timing repeats, the fastest is reported
+    Returns:
+        (dict): text_message calls per second
+    """
+    nle_language = NLELanguageObsv()
+    tty_chars = [nle_obsv["tty_chars"] for nle_obsv in trajectory]
+    menus = [
+        nle_tty_chars
+        for nle_tty_chars in tty_chars
+        if b"\n" in nle_language.text_message(nle_tty_chars)
+    ]
+    results = {}
+    for name, screens in [("trajectory", tty_chars), ("menus", menus)]:
+
+        def run(screens=screens):
+            for nle_tty_chars in screens:
+                nle_language.text_message(nle_tty_chars)
+
+        runtime = min(timeit.repeat(run, number=1, repeat=repeat))
+        results[name] = len(screens) / runtime
+    return results
+
+
+def benchmark_vector(nle_env_name, num_envs, steps, wait_action=18):
+    """Step num_envs games in lockstep, one NLELanguageWrapper after the other
+    and with NLELanguageVectorEnv.
+    Args:
+        nle_env_name (str): name of the NLE environment to step
+        num_envs (int): number of games
+        steps (int): number of lockstep steps
+        wait_action (int): nle action taken in every game
+    Returns:
+        (dict): game steps per second for each way
+    """
+    envs = [NLELanguageWrapper(make_nle_env(nle_env_name)) for _ in range(num_envs)]
+    for env in envs:
+        env.reset()
+    start = timeit.default_timer()
+    for _ in range(steps):
+        for env in envs:
+            obsv, _, done, _ = env.step("wait")
+            if done:
+                obsv = env.reset()
+            dict(obsv.items())
+    results = {"wrappers": num_envs * steps / (timeit.default_timer() - start)}
+    for env in envs:
+        env.close()
+
+    vector_env = NLELanguageVectorEnv(nle_env_name, num_envs, num_threads=0)
+    vector_env.reset()
+    actions = [wait_action] * num_envs
+    start = timeit.default_timer()
+    for _ in range(steps):
+        vector_env.step(actions)
+    results["vector env"] = num_envs * steps / (timeit.default_timer() - start)
+    vector_env.close()
+    return results
+
+
+async def fake_model(prompt, latency, rng):  # pylint: disable=['unused-argument']
+    """Stand-in for a language model choosing the next action.
+    Args:
+        prompt (str): language observation of the game
+        latency (float): seconds the model takes to answer
+        rng (np.random.Generator): random action choice
+    Returns:
+        (str): language action
+    """
+    await asyncio.sleep(latency)
+    return FAKE_MODEL_ACTIONS[rng.integers(len(FAKE_MODEL_ACTIONS))]
+
+
+async def play_async(game, steps, latency, rng):
+    obsv = await game.areset()
+    for _ in range(steps):
+        obsv, _, done, _ = await game.astep(
+            await fake_model("\n".join(obsv.values()), latency, rng)
+        )
+        if done:
+            obsv = await game.areset()
+
+
+async def play_games_async(nle_env_name, num_games, steps, latency, max_concurrency):
+    semaphore = asyncio.Semaphore(max_concurrency)
+    rng = np.random.default_rng(0)
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        games = [
+            AsyncNLELanguageWrapper(
+                NLELanguageWrapper(make_nle_env(nle_env_name)), executor, semaphore
+            )
+            for _ in range(num_games)
+        ]
+        start = timeit.default_timer()
+        await asyncio.gather(*[play_async(game, steps, latency, rng) for game in games])
+        runtime = timeit.default_timer() - start
+        await asyncio.gather(*[game.aclose() for game in games])
+    return runtime
+
+
+async def play_games_blocking(nle_env_name, num_games, steps, latency):
+    rng = np.random.default_rng(0)
+    games = [NLELanguageWrapper(make_nle_env(nle_env_name)) for _ in range(num_games)]
+    start = timeit.default_timer()
+    for game in games:
+        obsv = game.reset()
+        for _ in range(steps):
+            obsv, _, done, _ = game.step(
+                await fake_model("\n".join(obsv.values()), latency, rng)
+            )
+            if done:
+                obsv = game.reset()
+    runtime = timeit.default_timer() - start
+    for game in games:
+        game.close()
+    return runtime
+
+
+def benchmark_async(  # pylint: disable=too-many-arguments
+    nle_env_name, num_games, steps, latency=0.01, max_concurrency=8, blocking_games=5
+):
+    """Play games against a fake language model with latency, one blocking
+    game after the other and all of them concurrently with
+    AsyncNLELanguageWrapper.
+    Args:
+        nle_env_name (str): name of the NLE environment to play
+        num_games (int): number of concurrent games
+        steps (int): number of steps of each game
+        latency (float): seconds each fake model call takes
+        max_concurrency (int): limit on the steps running at once
+        blocking_games (int): number of games played one after the other
+    Returns:
+        (dict): game steps per second for each way
+    """
+    runtime = asyncio.run(
+        play_games_blocking(nle_env_name, blocking_games, steps, latency)
+    )
+    results = {"blocking": blocking_games * steps / runtime}
+    runtime = asyncio.run(
+        play_games_async(nle_env_name, num_games, steps, latency, max_concurrency)
+    )
+    results[f"{num_games} async games"] = num_games * steps / runtime
+    return results
+
+
+def print_results(results, unit):
+    baseline = next(iter(results.values()))
+    for name, rate in results.items():
+        print(f"{name}: {rate:,.0f} {unit} ({rate / baseline:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the nle-language-wrapper translation"
+    )
+    parser.add_argument(
+        "benchmark",
+        choices=["threads", "glyphs", "blstats", "message", "vector", "async"],
+    )
+    parser.add_argument("--env", default="NetHackChallenge-v0")
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--num_envs", type=int, default=64)
+    parser.add_argument("--num_games", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    if args.benchmark == "async":
+        results = benchmark_async(
+            args.env, args.num_games, max(1, args.steps // args.num_games), args.latency
+        )
+        print_results(results, "steps/s")
+        return
+
+    if args.benchmark == "vector":
+        results = benchmark_vector(
+            args.env, args.num_envs, max(1, args.steps // args.num_envs)
+        )
+        print_results(results, "steps/s")
+        return
+    trajectory = record_trajectory(args.env, args.steps)
+    if args.benchmark == "threads":
+        results = benchmark_threads(trajectory)
+        print_results(
+            {f"{threads} threads": rate for threads, rate in results.items()},
+            "translations/s",
+        )
+    elif args.benchmark == "glyphs":
+        results = benchmark_glyphs(
+            {
+                "trajectory": trajectory,
+                "busy levels": busy_levels(trajectory, len(trajectory) // 10),
+            }
+        )
+        print_results(results, "calls/s")
+    elif args.benchmark == "blstats":
+        print_results(benchmark_blstats(trajectory), "calls/s")
+    elif args.benchmark == "message":
+        print_results(benchmark_message(trajectory), "calls/s")
+
+
+if __name__ == "__main__":
+    main()
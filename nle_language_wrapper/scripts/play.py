@@ -4,26 +4,14 @@ import nle  # pylint: disable=unused-import
 from minihack.scripts.env_list import skip_envs_list
 
 from nle_language_wrapper import NLELanguageWrapper
+from nle_language_wrapper import make_nle_env
 
 
 def main(nethack_env_name):
     """
     Play a NLE based environment using the nle-language-wrapper.
     """
-    env = NLELanguageWrapper(
-        gym.make(
-            nethack_env_name,
-            observation_keys=[
-                "glyphs",
-                "blstats",
-                "tty_chars",
-                "inv_letters",
-                "inv_strs",
-                "tty_cursor",
-                "tty_colors",
-            ],
-        )
-    )
+    env = NLELanguageWrapper(make_nle_env(nethack_env_name))
     obsv = env.reset()
     total_reward = 0.0
     shown_help = False
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+from nle_language_wrapper import AsyncNLELanguageWrapper
+from nle_language_wrapper import NLELanguageWrapper
+
+
+def slow_step(fake_nle_env, seconds):
+    """Make the fake environment step take some time, returns the step counts"""
+    counts = {"running": 0, "max_running": 0, "done": 0}
+    lock = threading.Lock()
+
+    def step(_):
+        with lock:
+            counts["running"] += 1
+            counts["max_running"] = max(counts["max_running"], counts["running"])
+        time.sleep(seconds)
+        with lock:
+            counts["running"] -= 1
+            counts["done"] += 1
+        return mock.DEFAULT
+
+    fake_nle_env.step.side_effect = step
+    return counts
+
+
+def test_astep_matches_step(fake_nle_env):
+    expected_reset = dict(NLELanguageWrapper(fake_nle_env).reset())
+    expected_step = dict(NLELanguageWrapper(fake_nle_env).step("north")[0])
+
+    async def play():
+        async with AsyncNLELanguageWrapper(NLELanguageWrapper(fake_nle_env)) as dut:
+            obsv = await dut.areset()
+            step_obsv, reward, done, _ = await dut.astep("north")
+        return obsv, step_obsv, reward, done
+
+    obsv, step_obsv, reward, done = asyncio.run(play())
+    assert obsv == expected_reset
+    assert step_obsv == expected_step
+    assert reward == 0.0
+    assert not done
+    fake_nle_env.close.assert_called_once()
+
+
+def test_concurrency_limit(fake_nle_env):
+    counts = slow_step(fake_nle_env, 0.01)
+
+    async def play(num_games, num_steps):
+        semaphore = asyncio.Semaphore(2)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            games = [
+                AsyncNLELanguageWrapper(
+                    NLELanguageWrapper(fake_nle_env), executor, semaphore
+                )
+                for _ in range(num_games)
+            ]
+
+            async def play_game(game):
+                await game.areset()
+                for _ in range(num_steps):
+                    await game.astep("north")
+
+            await asyncio.gather(*[play_game(game) for game in games])
+
+    asyncio.run(play(num_games=6, num_steps=3))
+    assert counts["done"] == 18
+    assert counts["max_running"] == 2
+
+
+def test_cancel_and_close(fake_nle_env):
+    counts = slow_step(fake_nle_env, 0.05)
+
+    async def play():
+        dut = AsyncNLELanguageWrapper(NLELanguageWrapper(fake_nle_env))
+        await dut.areset()
+        step = asyncio.ensure_future(dut.astep("north"))
+        await asyncio.sleep(0.01)
+        step.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await step
+        # The cancelled step still ran to its end.
+        assert counts["done"] == 1
+        await dut.astep("north")
+        await dut.aclose()
+        with pytest.raises(RuntimeError, match="closed"):
+            await dut.astep("north")
+
+    asyncio.run(play())
+    assert counts["done"] == 2
+    fake_nle_env.close.assert_called_once()
+
+
+def test_concurrent_aclose(fake_nle_env):
+    async def play():
+        async with AsyncNLELanguageWrapper(NLELanguageWrapper(fake_nle_env)) as dut:
+            await dut.areset()
+            await asyncio.gather(dut.aclose(), dut.aclose())
+
+    asyncio.run(play())
+    fake_nle_env.close.assert_called_once()
+
+
+def test_cancel_aclose(fake_nle_env):
+    closed = threading.Event()
+
+    def close():
+        time.sleep(0.05)
+        closed.set()
+
+    fake_nle_env.close.side_effect = close
+
+    async def play():
+        dut = AsyncNLELanguageWrapper(NLELanguageWrapper(fake_nle_env))
+        await dut.areset()
+        aclose = asyncio.ensure_future(dut.aclose())
+        await asyncio.sleep(0.01)
+        aclose.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await aclose
+        # The cancelled close still ran to its end.
+        assert closed.is_set()
+        assert dut.closed
+        await dut.aclose()
+        with pytest.raises(RuntimeError, match="closed"):
+            await dut.astep("north")
+
+    asyncio.run(play())
+    fake_nle_env.close.assert_called_once()
@@ -0,0 +1,406 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from nle_language_wrapper.nle_language_obsv import NLELanguageObsv
+from nle_language_wrapper.nle_language_obsv import direction_names
+from nle_language_wrapper.nle_language_obsv import distance_names
+
+# Argument order of NLELanguageObsv.text_all.
+NLE_OBSV_KEYS = "glyphs blstats tty_cursor inv_strs inv_letters tty_chars".split()
+
+
+def stack_obsv(nle_obsvs):
+    return [
+        np.stack([nle_obsv[key] for nle_obsv in nle_obsvs]) for key in NLE_OBSV_KEYS
+    ]
+
+
+def batch_of_obsv(fake_nle_env, batch_size):
+    nle_obsvs = []
+    for i in range(batch_size):
+        nle_obsv = dict(fake_nle_env.reset())
+        glyphs = nle_obsv["glyphs"].copy()
+        glyphs[i % 21, (i * 7) % 79] = 397  # tame little dog
+        nle_obsv["glyphs"] = glyphs
+        blstats = nle_obsv["blstats"].copy()
+        blstats[20] = i  # Time
+        nle_obsv["blstats"] = blstats
+        nle_obsvs.append(nle_obsv)
+    return nle_obsvs
+
+
+@pytest.mark.parametrize("num_threads", [1, 4, 0])
+def test_text_all_batch_matches_single(fake_nle_env, num_threads):
+    nle_language = NLELanguageObsv()
+    nle_obsvs = batch_of_obsv(fake_nle_env, 24)
+    batch = nle_language.text_all_batch(*stack_obsv(nle_obsvs), num_threads=num_threads)
+    expected = [
+        nle_language.text_all(*[nle_obsv[key] for key in NLE_OBSV_KEYS])
+        for nle_obsv in nle_obsvs
+    ]
+    assert batch == expected
+
+
+def test_field_batches_match_text_all_batch(fake_nle_env):
+    nle_language = NLELanguageObsv()
+    (
+        glyphs,
+        blstats,
+        tty_cursor,
+        inv_strs,
+        inv_letters,
+        tty_chars,
+    ) = stack_obsv(batch_of_obsv(fake_nle_env, 5))
+    expected = nle_language.text_all_batch(
+        glyphs, blstats, tty_cursor, inv_strs, inv_letters, tty_chars
+    )
+    fields = zip(
+        nle_language.text_glyphs_batch(glyphs, blstats, num_threads=2),
+        nle_language.text_message_batch(tty_chars, num_threads=2),
+        nle_language.text_blstats_batch(blstats, num_threads=2),
+        nle_language.text_inventory_batch(inv_strs, inv_letters, num_threads=2),
+        nle_language.text_cursor_batch(glyphs, blstats, tty_cursor, num_threads=2),
+    )
+    assert list(fields) == expected
+
+
+def test_batch_size_mismatch(fake_nle_env):
+    nle_language = NLELanguageObsv()
+    glyphs, blstats, *_ = stack_obsv(batch_of_obsv(fake_nle_env, 3))
+    with pytest.raises(ValueError, match="blstats has batch size 2, expected 3"):
+        nle_language.text_glyphs_batch(glyphs, blstats[:2])
+
+
+def test_batch_glyphs_shape(fake_nle_env):
+    nle_language = NLELanguageObsv()
+    glyphs, blstats, *_ = stack_obsv(batch_of_obsv(fake_nle_env, 3))
+    with pytest.raises(ValueError, match="glyphs must have 3 dimensions"):
+        nle_language.text_glyphs_batch(glyphs[0], blstats)
+
+
+def test_batch_inner_shapes(fake_nle_env):
+    nle_language = NLELanguageObsv()
+    glyphs, blstats, tty_cursor, inv_strs, inv_letters, tty_chars = stack_obsv(
+        batch_of_obsv(fake_nle_env, 3)
+    )
+    with pytest.raises(ValueError, match=r"blstats must have shape \(N, 27\)"):
+        nle_language.text_blstats_batch(blstats[:, :20])
+    with pytest.raises(ValueError, match="at least one per inv_strs row"):
+        nle_language.text_inventory_batch(inv_strs, inv_letters[:, :1])
+    with pytest.raises(ValueError, match=r"tty_cursor must have shape \(N, 2\)"):
+        nle_language.text_all_batch(
+            glyphs, blstats, tty_cursor[:, :1], inv_strs, inv_letters, tty_chars
+        )
+    out = np.zeros((3, 5, 64), dtype=np.uint8)
+    lengths = np.zeros((3, 5), dtype=np.int64)
+    with pytest.raises(ValueError, match="blstats must have shape"):
+        nle_language.text_all_batch_into(
+            glyphs,
+            blstats[:, :20],
+            tty_cursor,
+            inv_strs,
+            inv_letters,
+            tty_chars,
+            out,
+            lengths,
+        )
+
+
+def test_incremental_matches_stateless(fake_nle_env):
+    nle_obsv = fake_nle_env.reset()
+    glyphs = nle_obsv["glyphs"].copy()
+    blstats = nle_obsv["blstats"].copy()
+    player_x, player_y = blstats[0], blstats[1]
+    steps = [(glyphs.copy(), blstats.copy()), (glyphs.copy(), blstats.copy())]
+    glyphs[0, 0] = 397  # tame little dog far from the player
+    steps.append((glyphs.copy(), blstats.copy()))
+    glyphs[player_y, player_x + 2] = 2370  # doorway in a visual ray
+    steps.append((glyphs.copy(), blstats.copy()))
+    blstats[0] += 1
+    steps.append((glyphs.copy(), blstats.copy()))
+
+    nle_language = NLELanguageObsv()
+    incremental = NLELanguageObsv(incremental=True)
+    for episode in [steps, steps[::-1]]:
+        incremental.reset()
+        for glyphs, blstats in episode:
+            assert incremental.text_glyphs(glyphs, blstats) == nle_language.text_glyphs(
+                glyphs, blstats
+            )
+
+
+def test_token_glyphs_matches_text_glyphs(fake_nle_env):
+    nle_language = NLELanguageObsv()
+    phrases = nle_language.glyph_phrases()
+    with pytest.raises(RuntimeError, match="set_phrase_tokens must be called"):
+        nle_language.token_glyphs(
+            np.zeros((21, 79), np.int16), np.zeros(27, np.int64), np.zeros(8, np.int32)
+        )
+    with pytest.raises(ValueError, match="expected"):
+        nle_language.set_phrase_tokens([[0]])
+    # Use the phrase id as its only token so the tokens spell out the text.
+    nle_language.set_phrase_tokens([[phrase_id] for phrase_id in range(len(phrases))])
+    for nle_obsv in batch_of_obsv(fake_nle_env, 4):
+        input_ids = np.zeros(256, dtype=np.int32)
+        count = nle_language.token_glyphs(
+            nle_obsv["glyphs"], nle_obsv["blstats"], input_ids
+        )
+        text = b"".join(phrases[token_id] for token_id in input_ids[:count])
+        assert text == nle_language.text_glyphs(nle_obsv["glyphs"], nle_obsv["blstats"])
+        truncated = np.zeros(3, dtype=np.int32)
+        assert (
+            nle_language.token_glyphs(
+                nle_obsv["glyphs"], nle_obsv["blstats"], truncated
+            )
+            == count
+        )
+        assert list(truncated) == list(input_ids[:3])
+
+
+def test_text_blstats_cache(fake_nle_env):
+    nle_language = NLELanguageObsv()
+    blstats = fake_nle_env.reset()["blstats"].copy()
+    blstats[20] = 5  # Time
+    first = nle_language.text_blstats(blstats)
+    assert b"\nTime: 5\n" in first
+    assert nle_language.text_blstats(blstats) == first
+    blstats[20] = -12345678901
+    assert b"\nTime: -12345678901\n" in nle_language.text_blstats(blstats)
+    blstats[20] = 5
+    assert nle_language.text_blstats(blstats) == first
+
+
+def test_text_message_blank_first_row():
+    tty_chars = np.full((24, 80), ord(" "), dtype=np.uint8)
+    for row, text in enumerate([b"Things that are here:", b"a dagger", b"--More--"]):
+        tty_chars[row + 1, 10 : 10 + len(text)] = np.frombuffer(text, np.uint8)
+    assert (
+        NLELanguageObsv().text_message(tty_chars)
+        == b"Things that are here:\na dagger\n--More--"
+    )
+
+
+def test_inventory_and_cursor_cache(fake_nle_env):
+    nle_language = NLELanguageObsv()
+    nle_obsv = fake_nle_env.reset()
+    inv_strs = nle_obsv["inv_strs"].copy()
+    cursor_args = (nle_obsv["glyphs"], nle_obsv["blstats"], nle_obsv["tty_cursor"])
+
+    first = nle_language.text_inventory(inv_strs, nle_obsv["inv_letters"])
+    assert nle_language.text_inventory(inv_strs, nle_obsv["inv_letters"]) is first
+    inv_strs[0, 0] = ord("X")
+    changed = nle_language.text_inventory(inv_strs, nle_obsv["inv_letters"])
+    assert changed != first
+    assert nle_language.text_cursor(*cursor_args) is nle_language.text_cursor(
+        *cursor_args
+    )
+    all_texts = nle_language.text_all(*[nle_obsv[key] for key in NLE_OBSV_KEYS])
+    assert all_texts[4] is nle_language.text_cursor(*cursor_args)
+
+    assert nle_language.cache_info() == {
+        "text_inventory": {"hits": 1, "misses": 3},
+        "text_cursor": {"hits": 3, "misses": 1},
+    }
+
+
+def test_content_cache_matches_uncached(fake_nle_env):
+    nle_obsvs = batch_of_obsv(fake_nle_env, 4)
+    uncached = NLELanguageObsv()
+    nle_language = NLELanguageObsv(cache_entries=16)
+    for nle_obsv in nle_obsvs * 2:
+        args = [nle_obsv[key] for key in NLE_OBSV_KEYS]
+        assert nle_language.text_all(*args) == uncached.text_all(*args)
+        assert nle_language.text_glyphs(
+            nle_obsv["glyphs"], nle_obsv["blstats"], max_lines=3
+        ) == uncached.text_glyphs(nle_obsv["glyphs"], nle_obsv["blstats"], max_lines=3)
+    cache_info = nle_language.cache_info()
+    # The 4 observations only differ in their glyphs and time.
+    assert cache_info["text_glyphs"] == {
+        "hits": 8,
+        "misses": 8,
+        "hit_rate": 0.5,
+        "evictions": 0,
+        "entries": 8,
+        "bytes": cache_info["text_glyphs"]["bytes"],
+    }
+    assert cache_info["text_message"]["hits"] == 7
+    assert cache_info["text_blstats"]["misses"] == 4
+    assert "text_glyphs" not in uncached.cache_info()
+
+
+def test_content_cache_eviction(fake_nle_env):
+    blstats = fake_nle_env.reset()["blstats"].copy()
+    nle_language = NLELanguageObsv(cache_entries=2)
+    for time in [1, 2, 3, 1]:
+        blstats[20] = time
+        nle_language.text_blstats(blstats)
+    cache_info = nle_language.cache_info()["text_blstats"]
+    assert (cache_info["misses"], cache_info["evictions"]) == (4, 2)
+    assert cache_info["entries"] == 2
+
+    entry_bytes = blstats.nbytes + len(nle_language.text_blstats(blstats))
+    nle_language = NLELanguageObsv(cache_entries=100, cache_bytes=2 * entry_bytes)
+    for time in [1, 2, 3]:
+        blstats[20] = time
+        nle_language.text_blstats(blstats)
+    cache_info = nle_language.cache_info()["text_blstats"]
+    assert cache_info["entries"] == 2
+    assert cache_info["bytes"] <= 2 * entry_bytes
+    assert cache_info["evictions"] == 1
+
+
+def test_as_str_matches_decoded_bytes(fake_nle_env):
+    nle_obsvs = batch_of_obsv(fake_nle_env, 3)
+    inv_strs = nle_obsvs[0]["inv_strs"].copy()
+    inv_strs[0, :3] = [0xE9, 0xFF, 0x80]  # Not ascii but valid latin-1
+    nle_obsvs[0]["inv_strs"] = inv_strs
+    nle_language = NLELanguageObsv()
+    nle_language_str = NLELanguageObsv(as_str=True)
+    for nle_obsv in nle_obsvs:
+        nle_args = [nle_obsv[key] for key in NLE_OBSV_KEYS]
+        texts = nle_language_str.text_all(*nle_args)
+        assert all(isinstance(text, str) for text in texts)
+        assert texts == tuple(
+            text.decode("latin-1") for text in nle_language.text_all(*nle_args)
+        )
+    batch = nle_language_str.text_all_batch(*stack_obsv(nle_obsvs))
+    assert batch == [
+        tuple(text.decode("latin-1") for text in texts)
+        for texts in nle_language.text_all_batch(*stack_obsv(nle_obsvs))
+    ]
+
+
+def test_text_all_into_matches_text_all(fake_nle_env):
+    nle_obsvs = batch_of_obsv(fake_nle_env, 3)
+    nle_language = NLELanguageObsv()
+    out = np.full((5, 4096), 0xFF, dtype=np.uint8)
+    lengths = np.zeros(5, dtype=np.int64)
+    for nle_obsv in nle_obsvs:
+        nle_args = [nle_obsv[key] for key in NLE_OBSV_KEYS]
+        expected = nle_language.text_all(*nle_args)
+        nle_language.text_all_into(*nle_args, out, lengths)
+        assert list(lengths) == [len(text) for text in expected]
+        written = [row[:length].tobytes() for row, length in zip(out, lengths)]
+        assert tuple(written) == expected
+
+    truncated = np.full((5, 8), 0xFF, dtype=np.uint8)
+    nle_language.text_all_into(*nle_args, truncated, lengths)
+    assert list(lengths) == [len(text) for text in expected]
+    assert [row.tobytes() for row in truncated] == [
+        text[:8].ljust(8, b"\xff") for text in expected
+    ]
+    with pytest.raises(TypeError):
+        nle_language.text_all_into(*nle_args, out.astype(np.int8), lengths)
+
+    batch_out = np.zeros((3, 5, 4096), dtype=np.uint8)
+    batch_lengths = np.zeros((3, 5), dtype=np.int64)
+    nle_language.text_all_batch_into(
+        *stack_obsv(nle_obsvs), batch_out, batch_lengths, num_threads=2
+    )
+    expected = nle_language.text_all_batch(*stack_obsv(nle_obsvs))
+    for texts, rows, row_lengths in zip(expected, batch_out, batch_lengths):
+        written = [row[:length].tobytes() for row, length in zip(rows, row_lengths)]
+        assert tuple(written) == texts
+
+
+def test_structured_glyphs_matches_text_glyphs(fake_nle_env):
+    nle_language = NLELanguageObsv()
+    for nle_obsv in batch_of_obsv(fake_nle_env, 4):
+        glyphs, blstats = nle_obsv["glyphs"], nle_obsv["blstats"]
+        structured = nle_language.structured_glyphs(glyphs, blstats)
+        assert structured.dtype.names == (
+            "glyph",
+            "dx",
+            "dy",
+            "distance",
+            "direction",
+            "source",
+        )
+        assert len(structured) > 0
+        player_x, player_y = blstats[0], blstats[1]
+        assert list(structured["glyph"]) == list(
+            glyphs[player_y + structured["dy"], player_x + structured["dx"]]
+        )
+        assert set(structured["source"]) <= {0, 1}
+        text = nle_language.text_glyphs(glyphs, blstats).decode("latin-1")
+        for record in structured:
+            distance = distance_names[record["distance"]]
+            direction = direction_names[record["direction"]]
+            assert f" {distance} " in text
+            assert direction in text
+
+
+def test_text_glyphs_budget(fake_nle_env):
+    nle_obsv = fake_nle_env.reset()
+    glyphs = nle_obsv["glyphs"].copy()
+    glyphs[0, 0] = 397  # tame little dog far from the player
+    blstats = nle_obsv["blstats"]
+    nle_language = NLELanguageObsv()
+    full = nle_language.text_glyphs(glyphs, blstats)
+    lines = full.split(b"\n")
+    assert len(lines) > 2
+    assert nle_language.text_glyphs(glyphs, blstats, max_chars=len(full)) == full
+    for max_lines in range(len(lines) + 1):
+        kept = nle_language.text_glyphs(glyphs, blstats, max_lines=max_lines)
+        kept_lines = kept.split(b"\n") if kept else []
+        assert len(kept_lines) == max_lines
+        # The kept lines keep their usual order.
+        assert [line for line in lines if line in kept_lines] == kept_lines
+    first = nle_language.text_glyphs(glyphs, blstats, max_lines=1)
+    assert first.startswith(b"tame little dog ")
+    shorter = nle_language.text_glyphs(glyphs, blstats, max_chars=len(full) - 1)
+    assert len(shorter) < len(full)
+    assert nle_language.text_glyphs_batch(glyphs[None], blstats[None], max_lines=1) == [
+        first
+    ]
+
+    incremental = NLELanguageObsv(incremental=True)
+    assert incremental.text_glyphs(glyphs, blstats, max_lines=1) == first
+    assert incremental.text_glyphs(glyphs, blstats) == full
+
+
+def test_token_glyphs_budget(fake_nle_env):
+    nle_obsv = fake_nle_env.reset()
+    glyphs = nle_obsv["glyphs"].copy()
+    glyphs[0, 0] = 397  # tame little dog far from the player
+    nle_language = NLELanguageObsv()
+    phrases = nle_language.glyph_phrases()
+    nle_language.set_phrase_tokens([[phrase_id] for phrase_id in range(len(phrases))])
+    input_ids = np.zeros(256, dtype=np.int32)
+    count = nle_language.token_glyphs(
+        glyphs, nle_obsv["blstats"], input_ids, max_tokens=5
+    )
+    assert 0 < count <= 5
+    text = b"".join(phrases[token_id] for token_id in input_ids[:count])
+    assert text == nle_language.text_glyphs(glyphs, nle_obsv["blstats"], max_lines=1)
+
+
+def test_shared_between_threads(fake_nle_env):
+    nle_obsvs = batch_of_obsv(fake_nle_env, 8)
+    nle_language = NLELanguageObsv(as_str=True)
+    phrase_tokens = [
+        [phrase_id] for phrase_id in range(len(nle_language.glyph_phrases()))
+    ]
+    nle_language.set_phrase_tokens(phrase_tokens)
+
+    def translate(i):
+        nle_obsv = nle_obsvs[i % len(nle_obsvs)]
+        glyphs, blstats = nle_obsv["glyphs"], nle_obsv["blstats"]
+        if i % 5 == 0:
+            nle_language.set_phrase_tokens(phrase_tokens)
+        input_ids = np.zeros(256, dtype=np.int32)
+        count = nle_language.token_glyphs(glyphs, blstats, input_ids)
+        return (
+            nle_language.text_all(*[nle_obsv[key] for key in NLE_OBSV_KEYS]),
+            nle_language.text_glyphs(glyphs, blstats, max_lines=2),
+            nle_language.structured_glyphs(glyphs, blstats).tobytes(),
+            input_ids[:count].tobytes(),
+            nle_language.text_all_batch(*stack_obsv([nle_obsv] * 2), num_threads=2),
+        )
+
+    expected = [translate(i) for i in range(len(nle_obsvs))]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(translate, range(800)))
+    assert results == [expected[i % len(expected)] for i in range(800)]
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from nle_language_wrapper import NLELanguageVectorEnv
+from nle_language_wrapper.nle_language_obsv import NLELanguageObsv
+from nle_language_wrapper.wrappers.lazy_obsv import LANGUAGE_FIELDS
+from nle_language_wrapper.wrappers.lazy_obsv import TEXT_ALL_KEYS
+
+
+@pytest.fixture
+def vector_env():
+    """Fixture for a vector environment of two NLE environments"""
+    env = NLELanguageVectorEnv("NetHackChallenge-v0", 2)
+    yield env
+    env.close()
+
+
+def test_vector_env_matches_single_translation(vector_env):
+    nle_language = NLELanguageObsv(as_str=True)
+    nle_obsvs = vector_env.env.reset()
+    expected = [
+        dict(
+            zip(
+                LANGUAGE_FIELDS,
+                nle_language.text_all(*[nle_obsvs[key][i] for key in TEXT_ALL_KEYS]),
+            )
+        )
+        for i in range(2)
+    ]
+    assert vector_env.nle_obsv_batch_to_language(nle_obsvs) == expected
+
+
+def test_vector_env_step(vector_env):
+    obsvs = vector_env.reset()
+    assert len(obsvs) == 2
+    assert set(obsvs[0]) == set(vector_env.single_observation_space.spaces)
+    obsvs, rewards, dones, infos = vector_env.step(["wait", 18])
+    assert len(obsvs) == len(infos) == 2
+    assert isinstance(obsvs[1]["text_blstats"], str)
+    assert rewards.shape == dones.shape == (2,)
+    with pytest.raises(ValueError, match="'invalid action'"):
+        vector_env.step(["invalid action", "wait"])
+
+
+def test_vector_env_text_fields():
+    env = NLELanguageVectorEnv(
+        "NetHackChallenge-v0", 2, text_fields=["text_inventory", "text_message"]
+    )
+    assert set(env.env.single_observation_space.spaces) == {
+        "inv_strs",
+        "inv_letters",
+        "tty_chars",
+    }
+    env.reset()
+    obsvs, _, _, _ = env.step(np.array([18, 18]))
+    env.close()
+    assert [list(obsv) for obsv in obsvs] == [["text_message", "text_inventory"]] * 2
+
+
+def test_vector_env_inexact_actions():
+    env = NLELanguageVectorEnv(
+        "NetHackChallenge-v0", 2, normalize_actions=True, fuzzy_action_cutoff=0.8
+    )
+    env.reset()
+    _, _, _, infos = env.step([" Wait.", "inventroy"])
+    assert len(infos) == 2
+    env.close()
+    env = NLELanguageVectorEnv("NetHackChallenge-v0", 2)
+    env.reset()
+    with pytest.raises(ValueError, match="'Wait.'"):
+        env.step(["wait", "Wait."])
+    env.close()
+
+
+def test_vector_env_terminal_observation():
+    env = NLELanguageVectorEnv("NetHackChallenge-v0", 2, max_episode_steps=3)
+    env.reset()
+    for _ in range(3):
+        obsvs, _, dones, infos = env.step(["wait", "wait"])
+    env.close()
+    assert dones.all()
+    for obsv, info in zip(obsvs, infos):
+        terminal_obsv = info["terminal_observation"]
+        assert set(terminal_obsv) == set(obsv)
+        assert "\nTime: 1\n" in obsv["text_blstats"]
+        assert "\nTime: 1\n" not in terminal_obsv["text_blstats"]
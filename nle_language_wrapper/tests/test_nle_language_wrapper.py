@@ -1,3 +1,4 @@
+import pickle
 import timeit
 
 import gym
@@ -6,6 +7,7 @@ import pytest
 from nle.nethack import actions as nethack_actions
 
 from nle_language_wrapper import NLELanguageWrapper
+from nle_language_wrapper import make_nle_env
 from nle_language_wrapper.scripts import play
 
 
@@ -81,6 +83,45 @@ def test_step_valid_action_not_supported(real_nethack_env):
         dut.step("travel")
 
 
+def test_pre_step_inexact_actions(real_nethack_env):
+    dut = NLELanguageWrapper(
+        real_nethack_env,
+        normalize_actions=True,
+        prefix_actions=True,
+        fuzzy_action_cutoff=0.8,
+    )
+    index = real_nethack_env.actions.index
+    assert dut.pre_step("K") == index(nethack_actions.CompassCardinalDirectionLonger.N)
+    assert dut.pre_step(" Move North.") == index(nethack_actions.CompassDirection.N)
+    assert dut.pre_step("pra") == index(nethack_actions.Command.PRAY)
+    assert dut.pre_step("north to the door") == index(
+        nethack_actions.CompassDirection.N
+    )
+    assert dut.pre_step("inventroy") == index(nethack_actions.Command.INVENTORY)
+    with pytest.raises(ValueError):
+        dut.pre_step("invalid action")
+
+
+def test_pre_step_exact_actions(real_nethack_env):
+    dut = NLELanguageWrapper(real_nethack_env)
+    assert dut.pre_step("north") == real_nethack_env.actions.index(
+        nethack_actions.CompassDirection.N
+    )
+    for action in ["North", "move north", "pra", "save the game"]:
+        with pytest.raises(ValueError):
+            dut.pre_step(action)
+
+
+def test_pre_step_batch(real_nethack_env):
+    dut = NLELanguageWrapper(real_nethack_env, normalize_actions=True)
+    actions = ["north", "k", "Search.", "east"]
+    nle_actions = dut.pre_step_batch(actions)
+    assert nle_actions.dtype == np.int64
+    assert nle_actions.tolist() == [dut.pre_step(action) for action in actions]
+    with pytest.raises(ValueError, match="'invalid action'"):
+        dut.pre_step_batch(["north", "invalid action"])
+
+
 def test_obsv_fake(fake_nle_env):
     dut = NLELanguageWrapper(fake_nle_env)
     obsv = dut.reset()
@@ -132,6 +173,113 @@ def test_obsv_fake(fake_nle_env):
     assert obsv["text_cursor"] == expected_cursor
 
 
+def test_text_all_matches_single_calls(fake_nle_env):
+    dut = NLELanguageWrapper(fake_nle_env)
+    nle_obsv = fake_nle_env.reset()
+    glyphs = nle_obsv["glyphs"]
+    blstats = nle_obsv["blstats"]
+    tty_cursor = nle_obsv["tty_cursor"]
+    inv_strs = nle_obsv["inv_strs"]
+    inv_letters = nle_obsv["inv_letters"]
+    tty_chars = nle_obsv["tty_chars"]
+    expected = (
+        dut.nle_language.text_glyphs(glyphs, blstats),
+        dut.nle_language.text_message(tty_chars),
+        dut.nle_language.text_blstats(blstats),
+        dut.nle_language.text_inventory(inv_strs, inv_letters),
+        dut.nle_language.text_cursor(glyphs, blstats, tty_cursor),
+    )
+    texts = dut.nle_language.text_all(
+        glyphs, blstats, tty_cursor, inv_strs, inv_letters, tty_chars
+    )
+    assert texts == expected
+
+
+def test_lazy_obsv_translates_on_access(fake_nle_env, mocker):
+    dut = NLELanguageWrapper(fake_nle_env)
+    expected = dut.nle_obsv_to_language(fake_nle_env.reset())
+    dut.nle_language = mocker.MagicMock(wraps=dut.nle_language)
+    obsv = dut.reset()
+    assert obsv["text_message"] == expected["text_message"]
+    assert obsv["text_message"] == expected["text_message"]
+    assert dut.nle_language.text_message.call_count == 1
+    assert not dut.nle_language.text_glyphs.called
+    assert not dut.nle_language.text_all.called
+    assert set(obsv) == set(dut.observation_space.spaces)
+    assert obsv == expected
+    with pytest.raises(KeyError):
+        obsv["glyphs"]  # pylint: disable=pointless-statement
+
+
+def test_lazy_obsv_detach(fake_nle_env):
+    dut = NLELanguageWrapper(fake_nle_env)
+    nle_obsv = fake_nle_env.reset()
+    expected = dut.nle_obsv_to_language(nle_obsv)
+    obsv = dut.reset()
+    assert obsv["text_message"] == expected["text_message"]
+    dut.detach_last_obsv()
+    # The base environment overwrites its arrays on the next step.
+    for key in ["glyphs", "blstats", "tty_cursor", "inv_strs", "tty_chars"]:
+        nle_obsv[key][...] = 0
+    assert dict(obsv) == expected
+    unpickled = pickle.loads(pickle.dumps(obsv))
+    assert isinstance(unpickled, dict)
+    assert unpickled == expected
+
+
+def test_lazy_obsv_translate_all_after_step(real_nethack_env):
+    dut = NLELanguageWrapper(real_nethack_env)
+    nle_obsv = real_nethack_env.reset()
+    expected = NLELanguageWrapper(real_nethack_env).nle_obsv_to_language(nle_obsv)
+    obsv = dut.post_reset(nle_obsv)
+    assert obsv["text_message"] == expected["text_message"]
+    dut.step("wait")
+    assert dict(obsv.items()) == expected
+    assert pickle.loads(pickle.dumps(obsv)) == expected
+
+
+def test_text_fields(fake_nle_env):
+    default = NLELanguageWrapper(fake_nle_env)
+    assert default.required_nle_obsv_keys == NLELanguageWrapper.REQUIRED_NLE_OBSV_KEYS
+    expected = default.reset()
+    dut = NLELanguageWrapper(
+        fake_nle_env, text_fields=["text_inventory", "text_message"]
+    )
+    assert set(dut.observation_space.spaces) == {"text_message", "text_inventory"}
+    assert dut.required_nle_obsv_keys == ("inv_strs", "inv_letters", "tty_chars")
+    obsv = dut.reset()
+    assert dict(obsv) == {
+        "text_message": expected["text_message"],
+        "text_inventory": expected["text_inventory"],
+    }
+    with pytest.raises(KeyError):
+        obsv["text_glyphs"]  # pylint: disable=pointless-statement
+    with pytest.raises(ValueError, match="Unknown text field"):
+        NLELanguageWrapper(fake_nle_env, text_fields=["text_map"])
+
+
+def test_make_nle_env():
+    nle_env = make_nle_env("NetHackChallenge-v0", text_fields=["text_message"])
+    assert set(nle_env.observation_space.spaces) == {"tty_chars"}
+    with pytest.raises(AssertionError, match="missing required obsv key"):
+        NLELanguageWrapper(nle_env)
+    dut = NLELanguageWrapper(nle_env, text_fields=["text_message"])
+    assert list(dut.reset()) == ["text_message"]
+    obsv, _, _, _ = dut.step("wait")
+    assert isinstance(obsv["text_message"], str)
+
+
+def test_cache_entries(real_nethack_env):
+    dut = NLELanguageWrapper(real_nethack_env, cache_entries=64)
+    uncached = NLELanguageWrapper(real_nethack_env)
+    nle_obsv = real_nethack_env.reset()
+    for _ in range(2):
+        assert dut.nle_obsv_to_language(nle_obsv) == uncached.nle_obsv_to_language(
+            nle_obsv
+        )
+    assert dut.nle_language.cache_info()["text_glyphs"]["hits"] == 1
+
+
 def test_blstats_condition_none(fake_nle_env):
     # Set condition to None.
     fake_nle_env.reset.return_value["blstats"][25] = 0
@@ -0,0 +1,146 @@
+import difflib
+import re
+import string
+
+import numpy as np
+
+# Words language models put before a direction, e.g. "move north".
+MOVE_WORDS = ("move", "go", "walk", "head", "step")
+
+
+def normalize_action(action):
+    """Default normalization of a language action: lower case, collapsed
+    whitespace, no surrounding punctuation or quotes and no leading word
+    of MOVE_WORDS, e.g. ' Move North.' becomes 'north'.
+    Args:
+        action (str): language action
+    Returns:
+        (str): normalized action
+    """
+    text = " ".join(action.lower().split()).strip(string.punctuation + " ")
+    verb, _, rest = text.partition(" ")
+    if verb in MOVE_WORDS and rest:
+        text = rest
+    return text
+
+
+class _TrieNode:  # pylint: disable=too-few-public-methods
+    __slots__ = ("children", "index", "completion")
+
+    def __init__(self):
+        self.children = {}
+        # Action index of the word ending here, or None.
+        self.index = None
+        # Action index of the only word starting with this prefix, None if
+        # there are several.
+        self.completion = None
+
+
+class ActionParser:
+    """Map language actions to action indices in a single call.
+    Exact action strings are looked up first, so every action accepted before
+    keeps its meaning, including single key strings such as "K" or ".". Other
+    strings are normalized and matched against the action words, then by
+    prefix in a trie of the action words, either a unique completion
+    ("pra" is "pray") or the longest action ending on a word boundary
+    ("north to the door" is "north"), and last by closest spelling.
+    """
+
+    def __init__(self, action_indices, normalize=True, prefix=True, fuzzy_cutoff=None):
+        """Precompile the lookup tables
+        Args:
+            action_indices (dict): action string to action index
+            normalize (bool or callable): normalize unknown actions with
+                normalize_action, a custom str to str function, or not at all
+            prefix (bool): match unknown actions by prefix
+            fuzzy_cutoff (float): minimum difflib similarity of a fuzzy match,
+                None disables fuzzy matching
+        """
+        self.action_indices = dict(action_indices)
+        if normalize is True:
+            normalize = normalize_action
+        self.normalize = normalize or None
+        self.prefix = prefix
+        self.fuzzy_cutoff = fuzzy_cutoff
+        # Only the action words take part in the inexact matching, the key
+        # strings are too short to be told apart after normalization.
+        self.word_indices = {
+            action: index
+            for action, index in self.action_indices.items()
+            if re.fullmatch(r"[a-z0-9 ]{2,}", action)
+        }
+        self.trie = _TrieNode()
+        for word, index in self.word_indices.items():
+            self._insert(word, index)
+
+    def _insert(self, word, index):
+        node = self.trie
+        for char in word:
+            node = node.children.setdefault(char, _TrieNode())
+            if node.completion is None:
+                node.completion = index
+            elif node.completion != index:
+                node.completion = -1
+        node.index = index
+
+    def _match_prefix(self, text):
+        node = self.trie
+        longest = None
+        for position, char in enumerate(text):
+            node = node.children.get(char)
+            if node is None:
+                return longest
+            at_boundary = position + 1 == len(text) or text[position + 1] == " "
+            if node.index is not None and at_boundary:
+                longest = node.index
+        if node.completion is not None and node.completion >= 0:
+            return node.completion
+        return longest
+
+    def parse(self, action):
+        """Translate a language action to an action index.
+        Args:
+            action (str): language/text action
+        Returns:
+            (int): action index, None if the action is not recognized
+        """
+        index = self.action_indices.get(action)
+        if index is not None:
+            return index
+        text = self.normalize(action) if self.normalize else action
+        index = self.word_indices.get(text)
+        if index is not None:
+            return index
+        if self.prefix and len(text) >= 2:
+            index = self._match_prefix(text)
+            if index is not None:
+                return index
+        if self.fuzzy_cutoff is not None:
+            matches = difflib.get_close_matches(
+                text, self.word_indices, n=1, cutoff=self.fuzzy_cutoff
+            )
+            if matches:
+                return self.word_indices[matches[0]]
+        return None
+
+    def parse_batch(self, actions):
+        """Translate a batch of language actions to action indices.
+        Args:
+            actions (List[str or int]): language/text actions, integers are
+                taken as action indices
+        Returns:
+            (np.ndarray): action indices
+        """
+        parse = self.parse
+        indices = [
+            parse(action) if isinstance(action, str) else action for action in actions
+        ]
+        if None in indices:
+            unknown = [
+                action for action, index in zip(actions, indices) if index is None
+            ]
+            raise ValueError(
+                f"Action(s) {', '.join(map(repr, unknown))} are not recognized "
+                "or not supported for this environment"
+            )
+        return np.array(indices, dtype=np.int64)
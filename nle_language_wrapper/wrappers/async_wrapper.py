@@ -0,0 +1,93 @@
+import asyncio
+from functools import partial
+
+
+class AsyncNLELanguageWrapper:
+    """asyncio interface of a NLELanguageWrapper, e.g. for agents waiting on
+    language model calls. The NLE step and the translation run in an executor
+    so that many games can be interleaved on one event loop. Calls on one game
+    run one at a time in order, a semaphore shared between games limits how
+    many steps run at once and makes the other games wait for a slot.
+    """
+
+    def __init__(self, env, executor=None, semaphore=None):
+        """Initialize the wrapper
+        Args:
+            env (NLELanguageWrapper): language wrapped NLE environment
+            executor (concurrent.futures.Executor): executor running the steps,
+                the default executor of the event loop if None
+            semaphore (asyncio.Semaphore): limit on the steps running at once,
+                shared between games, no limit if None
+        """
+        self.env = env
+        self.executor = executor
+        self.semaphore = semaphore
+        # Created on first use, before python 3.10 it binds to the event loop.
+        self.lock = None
+        self.closed = False
+
+    async def _run(self, function, *args, close=False):
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            if self.closed:
+                if close:
+                    return None
+                raise RuntimeError("Environment is closed")
+            if close:
+                # Marked before awaiting, a cancelled close still finishes.
+                self.closed = True
+            if self.semaphore is None:
+                return await self._run_in_executor(function, *args)
+            async with self.semaphore:
+                return await self._run_in_executor(function, *args)
+
+    async def _run_in_executor(self, function, *args):
+        future = asyncio.get_running_loop().run_in_executor(
+            self.executor, partial(function, *args)
+        )
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # The executor can not stop a running step, keep the game to
+            # ourselves until it finished so the next call sees its outcome.
+            await asyncio.wait([future])
+            raise
+
+    def _step(self, action):
+        obsv, reward, done, info = self.env.step(action)
+        # Translate in the executor rather than when read on the event loop.
+        obsv.translate_all()
+        return obsv, reward, done, info
+
+    def _reset(self, **kwargs):
+        obsv = self.env.reset(**kwargs)
+        obsv.translate_all()
+        return obsv
+
+    async def astep(self, action):
+        """Step the environment without blocking the event loop.
+        Args:
+            action (str or int): language/text action, or nle action for an
+                environment without use_language_action
+        Returns:
+            (tuple): language observation, reward, done and info as from step
+        """
+        return await self._run(self._step, action)
+
+    async def areset(self, **kwargs):
+        """Reset the environment without blocking the event loop.
+        Returns:
+            (LazyLanguageObsv): language observation
+        """
+        return await self._run(partial(self._reset, **kwargs))
+
+    async def aclose(self):
+        """Close the environment once its running step finished."""
+        await self._run(self.env.close, close=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
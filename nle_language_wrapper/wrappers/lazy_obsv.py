@@ -0,0 +1,127 @@
+from collections.abc import Mapping
+
+# Language observation key to the NLELanguageObsv method translating it & the
+# NLE observation keys of its arguments, in the order of the text_all results.
+LANGUAGE_FIELDS = {
+    "text_glyphs": ("text_glyphs", ("glyphs", "blstats")),
+    "text_message": ("text_message", ("tty_chars",)),
+    "text_blstats": ("text_blstats", ("blstats",)),
+    "text_inventory": ("text_inventory", ("inv_strs", "inv_letters")),
+    "text_cursor": ("text_cursor", ("glyphs", "blstats", "tty_cursor")),
+}
+
+# Argument order of NLELanguageObsv.text_all.
+TEXT_ALL_KEYS = "glyphs blstats tty_cursor inv_strs inv_letters tty_chars".split()
+
+
+def required_nle_obsv_keys(text_fields=None):
+    """NLE observation keys needed to translate some language observation keys.
+    Args:
+        text_fields (Iterable[str]): language observation keys, all if None
+    Returns:
+        (Tuple[str]): NLE observation keys in text_all argument order
+    """
+    text_fields = LANGUAGE_FIELDS if text_fields is None else set(text_fields)
+    unknown = set(text_fields).difference(LANGUAGE_FIELDS)
+    if unknown:
+        raise ValueError(
+            f"Unknown text field(s) {sorted(unknown)}, "
+            f"expected some of {list(LANGUAGE_FIELDS)}"
+        )
+    nle_keys = {nle_key for key in text_fields for nle_key in LANGUAGE_FIELDS[key][1]}
+    return tuple(nle_key for nle_key in TEXT_ALL_KEYS if nle_key in nle_keys)
+
+
+class LazyLanguageObsv(Mapping):
+    """Language observation translating each field on its first access.
+    Only references to the NLE observation arrays are kept until a field is
+    read, the translation is then memoized. NLE overwrites these arrays on its
+    next step, detach() copies the ones unread fields still need beforehand.
+    """
+
+    __slots__ = ("_nle_language", "_nle_obsv", "_text_fields", "_texts")
+
+    def __init__(self, nle_language, nle_obsv, text_fields=tuple(LANGUAGE_FIELDS)):
+        """Initialize the observation
+        Args:
+            nle_language (NLELanguageObsv): translator of the fields
+            nle_obsv (dict): NLE observation from the base environment
+            text_fields (Tuple[str]): language observation keys, in
+                LANGUAGE_FIELDS order
+        """
+        self._nle_language = nle_language
+        self._nle_obsv = nle_obsv
+        self._text_fields = text_fields
+        self._texts = {}
+
+    def __getitem__(self, key):
+        text = self._texts.get(key)
+        if text is None:
+            if key not in self._text_fields:
+                raise KeyError(key)
+            method, nle_keys = LANGUAGE_FIELDS[key]
+            text = getattr(self._nle_language, method)(
+                *[self._nle_obsv[nle_key] for nle_key in nle_keys]
+            )
+            self._texts[key] = text
+        return text
+
+    def __iter__(self):
+        return iter(self._text_fields)
+
+    def __len__(self):
+        return len(self._text_fields)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.translate_all()!r})"
+
+    def __reduce__(self):
+        # Pickled, e.g. to send it to another process, as a plain dict.
+        return dict, (dict(self.translate_all()),)
+
+    def translate_all(self):
+        """Translate the unread fields, all of them in one text_all call if
+        every field is selected, more than one is unread and detach() kept
+        all the NLE observation arrays.
+        Returns:
+            (dict): language observation
+        """
+        texts = self._texts
+        unread = len(self._text_fields) - len(texts)
+        if (
+            unread > 1
+            and len(self._text_fields) == len(LANGUAGE_FIELDS)
+            and all(nle_key in self._nle_obsv for nle_key in TEXT_ALL_KEYS)
+        ):
+            texts = dict(
+                zip(
+                    LANGUAGE_FIELDS,
+                    self._nle_language.text_all(
+                        *[self._nle_obsv[nle_key] for nle_key in TEXT_ALL_KEYS]
+                    ),
+                )
+            )
+            # Keep the texts already returned.
+            texts.update(self._texts)
+            self._texts = texts
+        elif unread > 0:
+            texts = {key: self[key] for key in self._text_fields}
+            self._texts = texts
+        return texts
+
+    def items(self):
+        return self.translate_all().items()
+
+    def values(self):
+        return self.translate_all().values()
+
+    def detach(self):
+        """Copy the NLE observation arrays the unread fields need, so that the
+        base environment can reuse its arrays.
+        """
+        nle_keys = required_nle_obsv_keys(
+            key for key in self._text_fields if key not in self._texts
+        )
+        self._nle_obsv = {
+            nle_key: self._nle_obsv[nle_key].copy() for nle_key in nle_keys
+        }
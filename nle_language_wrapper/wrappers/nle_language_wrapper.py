@@ -1,12 +1,17 @@
+import gym
 from gym import Wrapper
 from gym import spaces
 from nle.env import NLE
 from nle.nethack import actions as nethack_actions
 
 from nle_language_wrapper.nle_language_obsv import NLELanguageObsv
+from nle_language_wrapper.wrappers.action_parser import ActionParser
+from nle_language_wrapper.wrappers.lazy_obsv import LANGUAGE_FIELDS
+from nle_language_wrapper.wrappers.lazy_obsv import LazyLanguageObsv
+from nle_language_wrapper.wrappers.lazy_obsv import required_nle_obsv_keys
 
 
-class NLELanguageWrapper(Wrapper):
+class NLELanguageWrapper(Wrapper):  # pylint: disable=too-many-instance-attributes
     @property
     def spec(self):
         return self.env.spec
@@ -141,18 +146,13 @@ class NLELanguageWrapper(Wrapper):
         nethack_actions.WizardCommand.WIZWISH: ["wizard wish", "^w"],
     }
 
-    REQUIRED_NLE_OBSV_KEYS = {
-        "glyphs",
-        "blstats",
-        "tty_cursor",
-        "inv_strs",
-        "inv_letters",
-        "tty_chars",
-    }
+    # NLE observation keys needed by the default, all the text fields.
+    REQUIRED_NLE_OBSV_KEYS = required_nle_obsv_keys(LANGUAGE_FIELDS)
 
     def step(self, action):
         if self.use_language_action:
             action = self.pre_step(action)
+        self.detach_last_obsv()
         nle_obsv, reward, done, info = self.env.step(action)
         return self.post_step(nle_obsv), reward, done, info
 
@@ -161,17 +161,45 @@ class NLELanguageWrapper(Wrapper):
         Args:
             action (str): language/text action
         Returns:
-            (Enum): nle action
+            (int): nle action index
         """
-        if action not in self.action_str_enum_map:
+        nle_action_idx = self.action_parser.parse(action)
+        if nle_action_idx is None:
             raise ValueError(
                 f"Action {repr(action)} is not recognized "
                 "or not supported for this environment"
             )
-        nle_action_enum = self.action_str_enum_map[action]
-        nle_action_idx = self.action_enum_index_map[nle_action_enum]
         return nle_action_idx
 
+    def pre_step_batch(self, actions):
+        """Translate a batch of language actions to nle actions, e.g. for
+        vectorized environments.
+        Args:
+            actions (List[str]): language/text actions
+        Returns:
+            (np.ndarray): nle action indices
+        """
+        return self.action_parser.parse_batch(actions)
+
+    @classmethod
+    def language_action_indices(cls, nle_actions):
+        """Map the language actions of some NLE actions to their index.
+        Args:
+            nle_actions (Sequence[Enum]): actions of a NLE environment
+        Returns:
+            (dict): action string to nle action index
+        """
+        nle_action_idxs = {
+            nle_action_enum: nle_action_idx
+            for nle_action_idx, nle_action_enum in enumerate(nle_actions)
+        }
+        return {
+            action_str: nle_action_idxs[nle_action_enum]
+            for nle_action_enum, action_strs in cls.all_nle_action_map.items()
+            if nle_action_enum in nle_action_idxs
+            for action_str in action_strs
+        }
+
     def nle_obsv_to_language(self, nle_obsv):
         """Translate NLE Observation into a language observation.
         Args:
@@ -179,34 +207,37 @@ class NLELanguageWrapper(Wrapper):
         Returns:
             (dict): language observation
         """
-        glyphs = nle_obsv["glyphs"]
-        blstats = nle_obsv["blstats"]
-        tty_cursor = nle_obsv["tty_cursor"]
-        inv_strs = nle_obsv["inv_strs"]
-        inv_letters = nle_obsv["inv_letters"]
-        tty_chars = nle_obsv["tty_chars"]
-        return {
-            "text_glyphs": self.nle_language.text_glyphs(glyphs, blstats).decode(
-                "latin-1"
-            ),
-            "text_message": self.nle_language.text_message(tty_chars).decode("latin-1"),
-            "text_blstats": self.nle_language.text_blstats(blstats).decode("latin-1"),
-            "text_inventory": self.nle_language.text_inventory(
-                inv_strs, inv_letters
-            ).decode("latin-1"),
-            "text_cursor": self.nle_language.text_cursor(
-                glyphs, blstats, tty_cursor
-            ).decode("latin-1"),
-        }
+        return dict(
+            LazyLanguageObsv(self.nle_language, nle_obsv, self.text_fields).items()
+        )
+
+    def lazy_nle_obsv_to_language(self, nle_obsv):
+        """Wrap NLE Observation into a language observation translating each
+        field on its first access.
+        Args:
+            nle_obsv (dict): NLE observation from the base environment
+        Returns:
+            (LazyLanguageObsv): language observation
+        """
+        self.last_obsv = LazyLanguageObsv(self.nle_language, nle_obsv, self.text_fields)
+        return self.last_obsv
+
+    def detach_last_obsv(self):
+        """Let the last language observation keep its unread inputs before the
+        base environment overwrites them.
+        """
+        if self.last_obsv is not None:
+            self.last_obsv.detach()
+            self.last_obsv = None
 
     def post_step(self, nle_obsv):
         """Post step operations. Used for translating the observation
         Args:
             nle_obsv (dict): nle observation from base environment
         Returns:
-            (dict): language observation
+            (LazyLanguageObsv): language observation
         """
-        return self.nle_obsv_to_language(nle_obsv)
+        return self.lazy_nle_obsv_to_language(nle_obsv)
 
     def reset(self, **kwargs):
         self.pre_reset()
@@ -214,26 +245,53 @@ class NLELanguageWrapper(Wrapper):
         return self.post_reset(obsv)
 
     def pre_reset(self):
-        """Pre reset operations."""
+        """Pre reset operations. Forget the previous episode's glyphs."""
+        self.detach_last_obsv()
+        self.nle_language.reset()
 
     def post_reset(self, obsv):
         """Post reset operations.  Translate the NLE observation into language version
         Args:
             nle_obsv (dict): nle observation from base environment
         Returns:
-            (dict): language observation
+            (LazyLanguageObsv): language observation
         """
-        return self.nle_obsv_to_language(obsv)
+        return self.lazy_nle_obsv_to_language(obsv)
 
-    def __init__(self, env, use_language_action=True):
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        env,
+        use_language_action=True,
+        normalize_actions=False,
+        prefix_actions=False,
+        fuzzy_action_cutoff=None,
+        text_fields=None,
+        cache_entries=0,
+        cache_bytes=64 * 2**20,
+    ):
         """Initialize the wrapper
         Args:
             env (nle.env.NLE): NLE based environment to be wrapped
             use_language_action(bool): Use language action or discrete integer actions
+            normalize_actions (bool or callable): Normalize unrecognized language
+                actions, see ActionParser, only exact actions are accepted by
+                default
+            prefix_actions (bool): Match unrecognized language actions by prefix
+            fuzzy_action_cutoff (float): Minimum similarity of a fuzzy matched
+                language action, None disables fuzzy matching
+            text_fields (Iterable[str]): Language observation keys to produce,
+                all of them if None
+            cache_entries (int): Recently seen map, message and blstats inputs
+                to keep the text of, each, 0 disables the cache
+            cache_bytes (int): Memory budget of each of these caches
         """
         super().__init__(env)
         assert isinstance(env, NLE), "Only NLE environments are supported"
-        missing_obsv_keys = self.REQUIRED_NLE_OBSV_KEYS.difference(
+        if text_fields is None:
+            text_fields = LANGUAGE_FIELDS
+        self.required_nle_obsv_keys = required_nle_obsv_keys(text_fields)
+        self.text_fields = tuple(key for key in LANGUAGE_FIELDS if key in text_fields)
+        missing_obsv_keys = set(self.required_nle_obsv_keys).difference(
             env.observation_space.spaces.keys()
         )
         assert (
@@ -241,8 +299,16 @@ class NLELanguageWrapper(Wrapper):
         ), f"NLE environment missing required obsv key(s): {missing_obsv_keys}"
         # assert observations are included
         self.use_language_action = use_language_action
-        self.nle_language = NLELanguageObsv()
+        self.nle_language = NLELanguageObsv(
+            incremental=True,
+            as_str=True,
+            cache_entries=cache_entries,
+            cache_bytes=cache_bytes,
+        )
+        self.last_obsv = None
 
+        # Action maps kept for backward compatibility, e.g. play lists the
+        # action strings. pre_step uses the action parser built below.
         # Build map for action string to NLE Action Enum
         self.action_str_enum_map = {}
         for nle_action_enum, action_strs in self.all_nle_action_map.items():
@@ -258,14 +324,31 @@ class NLELanguageWrapper(Wrapper):
                     nle_action_enum
                 )
 
+        # Precompile the language action parser, action string to index
+        self.action_parser = ActionParser(
+            self.language_action_indices(self.env.actions),
+            normalize=normalize_actions,
+            prefix=prefix_actions,
+            fuzzy_cutoff=fuzzy_action_cutoff,
+        )
+
         if self.use_language_action:
             self.action_space = spaces.Space()
         self.observation_space = spaces.Dict(
-            {
-                "text_glyphs": spaces.Space(),
-                "text_message": spaces.Space(),
-                "text_blstats": spaces.Space(),
-                "text_inventory": spaces.Space(),
-                "text_cursor": spaces.Space(),
-            }
+            {key: spaces.Space() for key in self.text_fields}
         )
+
+
+def make_nle_env(nle_env_name, text_fields=None, **kwargs):
+    """Create a NLE environment observing only the keys needed to translate
+    some language observation keys, NLE copies every observed array each step.
+    Args:
+        nle_env_name (str): name of the NLE environment
+        text_fields (Iterable[str]): language observation keys, all if None
+        kwargs: other arguments of the NLE environment
+    Returns:
+        (nle.env.NLE): NLE environment
+    """
+    return gym.make(
+        nle_env_name, observation_keys=required_nle_obsv_keys(text_fields), **kwargs
+    )
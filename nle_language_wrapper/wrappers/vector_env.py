@@ -0,0 +1,159 @@
+from functools import partial
+
+from gym import Wrapper
+from gym import spaces
+from gym.vector import AsyncVectorEnv
+from gym.vector import VectorEnvWrapper
+
+from nle_language_wrapper.nle_language_obsv import NLELanguageObsv
+from nle_language_wrapper.wrappers.action_parser import ActionParser
+from nle_language_wrapper.wrappers.lazy_obsv import LANGUAGE_FIELDS
+from nle_language_wrapper.wrappers.lazy_obsv import TEXT_ALL_KEYS
+from nle_language_wrapper.wrappers.lazy_obsv import LazyLanguageObsv
+from nle_language_wrapper.wrappers.nle_language_wrapper import NLELanguageWrapper
+from nle_language_wrapper.wrappers.nle_language_wrapper import make_nle_env
+
+
+class CopyTerminalObsv(Wrapper):
+    """Copy the last NLE observation of an episode. The vector env workers
+    keep it as the terminal observation and reset, NLE would overwrite its
+    arrays in place with the first observation of the next episode.
+    """
+
+    def step(self, action):
+        nle_obsv, reward, done, info = self.env.step(action)
+        if done:
+            nle_obsv = {key: value.copy() for key, value in nle_obsv.items()}
+        return nle_obsv, reward, done, info
+
+
+def make_worker_env(nle_env_name, text_fields, **kwargs):
+    """Create the NLE environment of a vector env worker"""
+    return CopyTerminalObsv(make_nle_env(nle_env_name, text_fields, **kwargs))
+
+
+# VectorEnvWrapper forwards the other methods of VectorEnv to the wrapped env.
+# pylint: disable-next=abstract-method,too-many-instance-attributes
+class NLELanguageVectorEnv(VectorEnvWrapper):
+    """Step several NLE environments in worker processes and translate their
+    observations together. The workers write the raw NLE observations into
+    shared memory, the translation of the whole batch is a single native call
+    releasing the GIL. Observations are lists with a language observation dict
+    for each environment.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        nle_env_name,
+        num_envs,
+        use_language_action=True,
+        normalize_actions=False,
+        prefix_actions=False,
+        fuzzy_action_cutoff=None,
+        text_fields=None,
+        num_threads=1,
+        context=None,
+        **kwargs,
+    ):
+        """Initialize the vector environment
+        Args:
+            nle_env_name (str): name of the NLE environment to run
+            num_envs (int): number of environments
+            use_language_action (bool): Accept language actions, integer
+                actions are accepted either way
+            normalize_actions (bool or callable): Normalize unrecognized language
+                actions, see ActionParser, only exact actions are accepted by
+                default
+            prefix_actions (bool): Match unrecognized language actions by prefix
+            fuzzy_action_cutoff (float): Minimum similarity of a fuzzy matched
+                language action, None disables fuzzy matching
+            text_fields (Iterable[str]): Language observation keys to produce,
+                all of them if None
+            num_threads (int): native threads translating a batch,
+                num_threads <= 0 uses all available cores
+            context (str): multiprocessing start method of the workers
+            kwargs: other arguments of the NLE environment
+        """
+        if text_fields is None:
+            text_fields = LANGUAGE_FIELDS
+        env_fn = partial(make_worker_env, nle_env_name, tuple(text_fields), **kwargs)
+        super().__init__(
+            AsyncVectorEnv(
+                [env_fn] * num_envs, shared_memory=True, copy=False, context=context
+            )
+        )
+        self.text_fields = tuple(key for key in LANGUAGE_FIELDS if key in text_fields)
+        self.num_threads = num_threads
+        self.use_language_action = use_language_action
+        self.nle_language = NLELanguageObsv(as_str=True)
+        self.action_parser = ActionParser(
+            NLELanguageWrapper.language_action_indices(self.env.get_attr("actions")[0]),
+            normalize=normalize_actions,
+            prefix=prefix_actions,
+            fuzzy_cutoff=fuzzy_action_cutoff,
+        )
+        self.single_observation_space = spaces.Dict(
+            {key: spaces.Space() for key in self.text_fields}
+        )
+        self.observation_space = spaces.Tuple(
+            (self.single_observation_space,) * num_envs
+        )
+        if self.use_language_action:
+            self.single_action_space = spaces.Space()
+            self.action_space = spaces.Tuple((self.single_action_space,) * num_envs)
+
+    def nle_obsv_batch_to_language(self, nle_obsvs):
+        """Translate a batch of NLE observations into language observations.
+        Args:
+            nle_obsvs (dict): NLE observation arrays stacked over the
+                environments
+        Returns:
+            (List[dict]): language observation of each environment
+        """
+        if len(self.text_fields) == len(LANGUAGE_FIELDS):
+            texts = self.nle_language.text_all_batch(
+                *[nle_obsvs[nle_key] for nle_key in TEXT_ALL_KEYS],
+                num_threads=self.num_threads,
+            )
+        else:
+            texts = zip(
+                *[
+                    getattr(self.nle_language, f"{method}_batch")(
+                        *[nle_obsvs[nle_key] for nle_key in nle_keys],
+                        num_threads=self.num_threads,
+                    )
+                    for method, nle_keys in map(LANGUAGE_FIELDS.get, self.text_fields)
+                ]
+            )
+        return [dict(zip(self.text_fields, env_texts)) for env_texts in texts]
+
+    def reset_wait(self, **kwargs):
+        result = self.env.reset_wait(**kwargs)
+        if kwargs.get("return_info", False):
+            nle_obsvs, infos = result
+            return self.nle_obsv_batch_to_language(nle_obsvs), infos
+        return self.nle_obsv_batch_to_language(result)
+
+    def step_async(self, actions):
+        """Start stepping the environments.
+        Args:
+            actions (List[str or int]): language/text or nle action of each
+                environment
+        """
+        if self.use_language_action:
+            actions = self.action_parser.parse_batch(actions)
+        return self.env.step_async(actions)
+
+    def step_wait(self):
+        nle_obsvs, rewards, dones, infos = self.env.step_wait()
+        for info in infos:
+            # The last observation of an episode, the workers reset on done.
+            if "terminal_observation" in info:
+                info["terminal_observation"] = dict(
+                    LazyLanguageObsv(
+                        self.nle_language,
+                        info["terminal_observation"],
+                        self.text_fields,
+                    ).items()
+                )
+        return self.nle_obsv_batch_to_language(nle_obsvs), rewards, dones, infos
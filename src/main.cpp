@@ -3,19 +3,29 @@
 #include <pybind11/cast.h>
 #include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
 #include <stdio.h>
 #include <unistd.h>
 
+#include <algorithm>
 #include <array>
+#include <atomic>
+#include <bitset>
 #include <cassert>
+#include <charconv>
 #include <cstring>
 #include <deque>
 #include <iostream>
 #include <list>
 #include <map>
 #include <memory>
+#include <mutex>
+#include <optional>
 #include <set>
+#include <stdexcept>
 #include <string>
+#include <string_view>
+#include <thread>
 #include <unordered_map>
 #include <vector>
 
@@ -33,6 +43,8 @@ namespace py = pybind11;
 // Dungeon dimensions
 #define DUNGEON_WIDTH 79u
 #define DUNGEON_HEIGHT 21u
+// Number of bottom line stats in blstats
+#define BLSTATS_SIZE 27u
 
 enum DIRECTION {
   east,
@@ -45,36 +57,282 @@ enum DIRECTION {
   northeast
 };
 
+// (x, y) screen offset of one step in each DIRECTION.
+const std::array<std::pair<int64_t, int64_t>, 8> direction_steps = {{
+    {1, 0},
+    {1, 1},
+    {0, 1},
+    {-1, 1},
+    {-1, 0},
+    {-1, -1},
+    {0, -1},
+    {1, -1},
+}};
+
+// Number of cells the visual view looks along each direction.
+#define RAY_LENGTH 9u
+
+// Distance descriptions, ordered from furthest to closest as in text_glyphs.
+const std::array<std::string, 5> distance_names = {"very far", "far", "near",
+                                                   "very near", "adjacent"};
+
+// Direction descriptions, ordered clockwise from north as in text_glyphs.
+// The last entry is the position of the player itself.
+const std::array<std::string, 17> direction_names = {
+    "north", "northnortheast", "northeast", "eastnortheast",
+    "east",  "eastsoutheast",  "southeast", "southsoutheast",
+    "south", "southsouthwest", "southwest", "westsouthwest",
+    "west",  "westnorthwest",  "northwest", "northnorthwest",
+    ""};
+
+// Words joining the directions of a glyph and the glyphs themselves.
+enum JOIN_PHRASE { comma_phrase, and_phrase, newline_phrase };
+const std::array<std::string, 3> join_phrases = {",", " and", "\n"};
+
+// Order in which the lines of text_glyphs are kept under a budget, then the
+// closest first.
+enum GLYPH_PRIORITY {
+  creature_object_priority,
+  feature_priority,
+  blocking_priority,
+  priority_count
+};
+
 namespace nle_language_obsv {
 
+// Stacked observations from many environments, first dimension is the batch.
+template <typename T>
+using batch_array = py::array_t<T, py::array::c_style | py::array::forcecast>;
+
+// Lookup without operator[] so that the maps are never modified while the
+// batch methods share an instance between threads.
+template <typename K>
+const std::string &find_or_empty(
+    const std::unordered_map<K, std::string> &lookup, const K &key) {
+  static const std::string empty = "";
+  auto it = lookup.find(key);
+  if (it == lookup.end()) return empty;
+  return it->second;
+}
+
+// Limits on the lines of text_glyphs and on their size in characters or
+// tokens, the lines of the lowest priority are dropped first.
+struct GlyphBudget {
+  size_t max_lines = SIZE_MAX;
+  size_t max_size = SIZE_MAX;
+  bool operator==(const GlyphBudget &other) const {
+    return max_lines == other.max_lines && max_size == other.max_size;
+  }
+};
+
+// A fast hash of raw observation bytes, four independent multiply-xor lanes
+// over 8 byte words.
+static uint64_t hash_bytes(std::string_view bytes) {
+  const uint64_t multiplier = 0xff51afd7ed558ccdULL;
+  uint64_t lanes[4] = {0x9e3779b97f4a7c15ULL, 0xc2b2ae3d27d4eb4fULL,
+                       0x165667b19e3779f9ULL, 0x27d4eb2f165667c5ULL};
+  const char *data = bytes.data();
+  size_t size = bytes.size();
+  size_t i = 0;
+  for (; i + 32 <= size; i += 32) {
+    for (size_t lane = 0; lane < 4; lane++) {
+      uint64_t word;
+      std::memcpy(&word, data + i + lane * 8, 8);
+      lanes[lane] = (lanes[lane] ^ word) * multiplier;
+      lanes[lane] ^= lanes[lane] >> 29;
+    }
+  }
+  for (; i < size; i++) {
+    lanes[i % 4] = (lanes[i % 4] ^ static_cast<uint8_t>(data[i])) * multiplier;
+  }
+  uint64_t hash = size;
+  for (uint64_t lane : lanes) {
+    hash = (hash ^ lane) * multiplier;
+    hash ^= hash >> 32;
+  }
+  return hash;
+}
+
+static void append_bytes(std::string &key, const void *data, size_t size) {
+  key.append(reinterpret_cast<const char *>(data), size);
+}
+
+// Texts of recently seen inputs of a field, keyed by the raw bytes of the
+// inputs. Entries are found by a hash of the key and checked against the key
+// itself, so different inputs never share a text. The least recently used
+// entries are evicted to stay within max_entries & max_bytes, counting the
+// bytes of the keys and texts. Disabled when max_entries is 0. The limits are
+// fixed at construction and read without the lock, the rest of the state is
+// guarded by the mutex.
+class ContentCache {
+ public:
+  ContentCache(size_t max_entries, size_t max_bytes)
+      : max_entries(max_entries), max_bytes(max_bytes) {}
+  bool enabled() const { return max_entries > 0; }
+  bool find(const std::string &key, uint64_t hash, std::string &output) {
+    std::lock_guard<std::mutex> lock(mutex);
+    auto it = index.find(hash);
+    if (it == index.end() || it->second->key != key) {
+      misses++;
+      return false;
+    }
+    hits++;
+    entries.splice(entries.begin(), entries, it->second);
+    output = it->second->output;
+    return true;
+  }
+  void insert(std::string key, uint64_t hash, const std::string &output) {
+    size_t size = key.size() + output.size();
+    if (size > max_bytes) return;
+    std::lock_guard<std::mutex> lock(mutex);
+    // Another thread inserted it meanwhile or a different key has the hash.
+    auto it = index.find(hash);
+    if (it != index.end()) {
+      bytes -= it->second->key.size() + it->second->output.size();
+      entries.erase(it->second);
+      index.erase(it);
+    }
+    entries.push_front({hash, std::move(key), output});
+    index[hash] = entries.begin();
+    bytes += size;
+    evict();
+  }
+  py::dict info() {
+    std::lock_guard<std::mutex> lock(mutex);
+    double lookups = hits + misses;
+    return py::dict(py::arg("hits") = hits, py::arg("misses") = misses,
+                    py::arg("hit_rate") = lookups > 0 ? hits / lookups : 0.0,
+                    py::arg("evictions") = evictions,
+                    py::arg("entries") = entries.size(),
+                    py::arg("bytes") = bytes);
+  }
+
+ private:
+  struct Entry {
+    uint64_t hash;
+    std::string key;
+    std::string output;
+  };
+  void evict() {
+    while (!entries.empty() &&
+           (entries.size() > max_entries || bytes > max_bytes)) {
+      Entry &entry = entries.back();
+      bytes -= entry.key.size() + entry.output.size();
+      index.erase(entry.hash);
+      entries.pop_back();
+      evictions++;
+    }
+  }
+  const size_t max_entries;
+  const size_t max_bytes;
+  std::mutex mutex;
+  size_t bytes = 0;
+  uint64_t hits = 0;
+  uint64_t misses = 0;
+  uint64_t evictions = 0;
+  // Most recently used first.
+  std::list<Entry> entries;
+  std::unordered_map<uint64_t, std::list<Entry>::iterator> index;
+};
+
+// One instance can be shared between threads. The lookup tables are built once
+// and only read afterwards, each call works on the stack or on thread local
+// scratch, and the translation that needs no per instance state is const. The
+// remaining per instance state is guarded: the text_inventory & text_cursor
+// caches by the GIL, the incremental state & the content caches by a mutex,
+// and the phrase token table is only ever replaced as a whole.
 class NLELanguageObsv {
  public:
-  NLELanguageObsv(void);
-  py::bytes text_glyphs(py::array_t<int16_t> glyphs,
-                        py::array_t<int64_t> blstats);
-  py::bytes text_blstats(py::array_t<int64_t> blstats);
-  py::bytes text_inventory(py::array_t<uint8_t> inv_strs,
-                           py::array_t<uint8_t> inv_letters);
-  py::bytes text_cursor(py::array_t<int16_t> glyphs,
-                        py::array_t<int64_t> blstats,
-                        py::array_t<int64_t> tty_cursor);
-  py::bytes text_message(py::array_t<uint8_t> tty_chars);
+  // A described glyph relative to the player, the numeric form of a line of
+  // text_glyphs. dy grows southward as the rows of glyphs, source is 0 for
+  // the fullscreen view and 1 for the visual view rays.
+  struct StructuredGlyph {
+    int16_t glyph;
+    int8_t dx;
+    int8_t dy;
+    uint8_t distance;
+    uint8_t direction;
+    uint8_t source;
+  };
+
+  explicit NLELanguageObsv(bool incremental = false, bool as_str = false,
+                           size_t cache_entries = 0,
+                           size_t cache_bytes = 64 << 20);
+  void reset();
+  py::dict cache_info();
+  py::object text_glyphs(py::array_t<int16_t> glyphs,
+                         py::array_t<int64_t> blstats,
+                         std::optional<size_t> max_lines,
+                         std::optional<size_t> max_chars);
+  py::object text_blstats(py::array_t<int64_t> blstats);
+  py::object text_inventory(py::array_t<uint8_t> inv_strs,
+                            py::array_t<uint8_t> inv_letters);
+  py::object text_cursor(py::array_t<int16_t> glyphs,
+                         py::array_t<int64_t> blstats,
+                         py::array_t<int64_t> tty_cursor);
+  py::object text_message(py::array_t<uint8_t> tty_chars);
+  py::tuple text_all(py::array_t<int16_t> glyphs, py::array_t<int64_t> blstats,
+                     py::array_t<int64_t> tty_cursor,
+                     py::array_t<uint8_t> inv_strs,
+                     py::array_t<uint8_t> inv_letters,
+                     py::array_t<uint8_t> tty_chars);
+  py::list text_glyphs_batch(batch_array<int16_t> glyphs,
+                             batch_array<int64_t> blstats, int num_threads,
+                             std::optional<size_t> max_lines,
+                             std::optional<size_t> max_chars);
+  py::list text_blstats_batch(batch_array<int64_t> blstats, int num_threads);
+  py::list text_inventory_batch(batch_array<uint8_t> inv_strs,
+                                batch_array<uint8_t> inv_letters,
+                                int num_threads);
+  py::list text_cursor_batch(batch_array<int16_t> glyphs,
+                             batch_array<int64_t> blstats,
+                             batch_array<int64_t> tty_cursor, int num_threads);
+  py::list text_message_batch(batch_array<uint8_t> tty_chars, int num_threads);
+  py::array_t<StructuredGlyph> structured_glyphs(py::array_t<int16_t> glyphs,
+                                                 py::array_t<int64_t> blstats);
+  py::list glyph_phrases();
+  void set_phrase_tokens(std::vector<std::vector<int32_t>> token_ids);
+  size_t token_glyphs(py::array_t<int16_t> glyphs, py::array_t<int64_t> blstats,
+                      py::array_t<int32_t, py::array::c_style> input_ids,
+                      std::optional<size_t> max_lines,
+                      std::optional<size_t> max_tokens);
+  py::list text_all_batch(batch_array<int16_t> glyphs,
+                          batch_array<int64_t> blstats,
+                          batch_array<int64_t> tty_cursor,
+                          batch_array<uint8_t> inv_strs,
+                          batch_array<uint8_t> inv_letters,
+                          batch_array<uint8_t> tty_chars, int num_threads);
+  void text_all_into(py::array_t<int16_t> glyphs, py::array_t<int64_t> blstats,
+                     py::array_t<int64_t> tty_cursor,
+                     py::array_t<uint8_t> inv_strs,
+                     py::array_t<uint8_t> inv_letters,
+                     py::array_t<uint8_t> tty_chars,
+                     py::array_t<uint8_t, py::array::c_style> out,
+                     py::array_t<int64_t, py::array::c_style> lengths);
+  void text_all_batch_into(
+      batch_array<int16_t> glyphs, batch_array<int64_t> blstats,
+      batch_array<int64_t> tty_cursor, batch_array<uint8_t> inv_strs,
+      batch_array<uint8_t> inv_letters, batch_array<uint8_t> tty_chars,
+      py::array_t<uint8_t, py::array::c_style> out,
+      py::array_t<int64_t, py::array::c_style> lengths, int num_threads);
 
  private:
-  std::unordered_map<int64_t, std::string> alignment_map{
+  // The lookup tables below are shared by every instance, they are built once
+  // by the first constructor and only read afterwards.
+  inline static const std::unordered_map<int64_t, std::string> alignment_map{
       {A_NONE, "None"},
       {A_LAWFUL, "Lawful"},
       {A_NEUTRAL, "Neutral"},
       {A_CHAOTIC, "Chaotic"}};
 
-  const std::set<std::string> cmap_floor{
+  inline static const std::set<std::string> cmap_floor{
       "room floor",
       "dark room floor",
       "corridor floor",
       "lit corridor floor",
   };
 
-  const std::set<std::string> blocking_view{
+  inline static const std::set<std::string> blocking_view{
       "dark area",
       "vertical wall",
       "horizontal wall",
@@ -93,7 +351,7 @@ class NLELanguageObsv {
       "vertical raised drawbridge",
   };
 
-  const std::set<std::string> cmap_screen_include{
+  inline static const std::set<std::string> cmap_screen_include{
       "horizontal closed door",
       "vertical closed door",
       "bars",
@@ -113,7 +371,7 @@ class NLELanguageObsv {
       "vertical raised drawbridge",
       "horizontal raised drawbridge",
   };
-  const char *cmap_lookup[100]{
+  inline static const char *const cmap_lookup[100]{
       "dark area",
       "vertical wall",
       "horizontal wall",
@@ -213,7 +471,7 @@ class NLELanguageObsv {
       "MAXPCHARS",
   };
 
-  std::unordered_map<int64_t, std::string> condition_map = {
+  inline static const std::unordered_map<int64_t, std::string> condition_map = {
       {BL_MASK_STONE, "Stoned"},
       {BL_MASK_SLIME, "Slimed"},
       {BL_MASK_STRNGL, "Strangled"},
@@ -229,82 +487,336 @@ class NLELanguageObsv {
       {BL_MASK_RIDE, "Riding"},
   };
 
-  std::unordered_map<int64_t, std::string> encumbrance_map{
+  inline static const std::unordered_map<int64_t, std::string> encumbrance_map{
       {UNENCUMBERED, "Unencumbered"}, {SLT_ENCUMBER, "Burdened"},
       {MOD_ENCUMBER, "Stressed"},     {HVY_ENCUMBER, "Strained"},
       {EXT_ENCUMBER, "Overtaxed"},    {OVERLOADED, "Overloaded"}};
 
-  std::unordered_map<int64_t, std::string> hunger_map{
+  inline static const std::unordered_map<int64_t, std::string> hunger_map{
       {SATIATED, "Satiated"}, {NOT_HUNGRY, "Not Hungry"}, {HUNGRY, "Hungry"},
       {WEAK, "Weak"},         {FAINTING, "Fainting"},     {FAINTED, "Fainted"},
       {STARVED, "Starved"}};
 
+  // A glyph seen at a distance and direction from the player. Names are ids
+  // into glyph_names so no text is produced until the final render.
+  struct GlyphRecord {
+    uint16_t name_id;
+    uint8_t distance_id;
+    uint8_t direction_id;
+  };
+  // Glyph records merged by name & distance, the directions are
+  // GlyphScratch::direction_ids[directions_begin:directions_end].
+  struct GlyphGroup {
+    uint16_t name_id;
+    uint8_t distance_id;
+    uint32_t directions_begin;
+    uint32_t directions_end;
+  };
+  // Working storage for glyphs_to_text, kept per thread and reused between
+  // steps so translation only allocates while the buffers grow.
+  struct GlyphScratch {
+    std::vector<GlyphRecord> records;
+    std::vector<GlyphRecord> sorted_records;
+    // Per name id, the group of the name in the current distance, or -1.
+    std::vector<int32_t> name_slots;
+    std::vector<uint16_t> slot_name_ids;
+    std::vector<uint32_t> slot_offsets;
+    std::vector<uint8_t> slot_direction_ids;
+    std::vector<GlyphGroup> groups;
+    std::vector<uint8_t> direction_ids;
+    // Group indices in the order they are kept under a budget.
+    std::vector<uint32_t> group_order;
+    std::vector<uint8_t> group_kept;
+    std::string text;
+  };
+  static GlyphBudget glyph_budget(std::optional<size_t> max_lines,
+                                  std::optional<size_t> max_size);
+
   void build_fullscreen_view_glyph_map();
-  std::list<std::tuple<std::string, std::string, std::string>>
-  sort_by_distance_direction(
-      std::list<std::tuple<std::string, std::string, std::string>>
-          glyph_distance_direction);
-  std::list<std::tuple<std::string, std::string, std::string>>
-  compress_by_glyph(std::list<std::tuple<std::string, std::string, std::string>>
-                        glyph_distance_direction_set);
+  void sort_by_distance_direction(
+      const std::vector<GlyphRecord> &glyph_records,
+      std::vector<GlyphRecord> &sorted_records) const;
+  void compress_by_glyph(const std::vector<GlyphRecord> &glyph_records,
+                         GlyphScratch &scratch) const;
+  template <typename F>
+  void for_each_group_phrase(const GlyphScratch &scratch,
+                             const GlyphGroup &group, F emit) const;
+  template <typename F>
+  void for_each_glyph_phrase(const GlyphScratch &scratch, F emit) const;
+  template <typename F>
+  void select_glyph_groups(GlyphScratch &scratch, const GlyphBudget &budget,
+                           F phrase_size) const;
+  void render_glyph_groups(const GlyphScratch &scratch,
+                           std::string &output) const;
+  struct PhraseTokens;
+  size_t render_glyph_tokens(const GlyphScratch &scratch,
+                             const PhraseTokens &tokens, int32_t *input_ids,
+                             size_t capacity) const;
+  void build_glyph_phrases();
   void build_screen_pos_to_distance_direction(void);
-  void build_noun_plural_lookup();
+  void build_ray_tables();
+  void build_glyph_name_ids();
+  uint16_t glyph_name_id(const std::string &name);
   void build_visual_view_glyph_map();
-  std::pair<std::string, std::string> pos_to_str(int x, int y);
-  std::string offset_to_str(int offset);
-  int diagonal_distance(int dx, int dy);
-  std::list<std::tuple<std::string, std::string, std::string>> fullscreen_view(
-      int16_t *glyphs_data, int64_t *blstats_data);
-  std::list<std::tuple<std::string, std::string, std::string>> visual_view(
-      int16_t *glyphs_data, int64_t *blstats_data);
-  std::pair<int, int> local_glyph_to_global(int glyph_idx, int player_x,
-                                            int player_y);
-  std::string trim(std::string input);
-  std::list<std::tuple<std::string, std::string, std::string>> ray_march(
-      DIRECTION direction, int64_t player_x, int64_t player_y,
-      int16_t *glyphs_data);
-
-  std::array<std::string, MAX_GLYPH> fullscreen_view_glyph_map;
-  std::array<std::string, MAX_GLYPH> visual_view_glyph_map;
-  std::unordered_map<std::string, std::string> noun_plural_lookup;
-  std::array<
-      std::array<std::pair<std::string, std::string>, DUNGEON_HEIGHT * 2>,
+  std::pair<std::string, std::string> pos_to_str(int x, int y) const;
+  std::string offset_to_str(int offset) const;
+  int diagonal_distance(int dx, int dy) const;
+  void fullscreen_view(int16_t *glyphs_data, int64_t *blstats_data,
+                       std::vector<GlyphRecord> &glyph_records) const;
+  void visual_view(int16_t *glyphs_data, int64_t *blstats_data,
+                   std::vector<GlyphRecord> &glyph_records) const;
+  std::string_view trim(std::string_view input) const;
+  // Call emit(cell index, record) for every glyph record of a view.
+  template <typename F>
+  void for_each_fullscreen_glyph(int16_t *glyphs_data, int64_t *blstats_data,
+                                 F emit) const;
+  template <typename F>
+  void for_each_visual_glyph(int16_t *glyphs_data, int64_t *blstats_data,
+                             F emit) const;
+  template <typename F>
+  void ray_march(DIRECTION direction, int64_t player_x, int64_t player_y,
+                 int16_t *glyphs_data, F emit) const;
+
+  inline static std::once_flag tables_built;
+  inline static std::array<std::string, MAX_GLYPH> fullscreen_view_glyph_map;
+  inline static std::array<std::string, MAX_GLYPH> visual_view_glyph_map;
+  // Every distinct glyph name and plural, id 0 is the empty name.
+  inline static std::vector<std::string> glyph_names;
+  inline static std::unordered_map<std::string, uint16_t> glyph_name_lookup;
+  inline static std::array<uint16_t, MAX_GLYPH> fullscreen_view_name_ids;
+  inline static std::array<uint16_t, MAX_GLYPH> visual_view_name_ids;
+  inline static std::vector<uint16_t> plural_name_ids;
+  // GLYPH_PRIORITY of every name id.
+  inline static std::vector<uint8_t> name_priorities;
+  // The text of glyph_names, then " " + distance_names, " " + direction_names
+  // and join_phrases.
+  inline static std::vector<std::string> glyph_phrase_texts;
+  inline static size_t distance_phrase_begin;
+  inline static size_t direction_phrase_begin;
+  inline static size_t join_phrase_begin;
+  // (distance id, direction id) for each position relative to the player.
+  inline static std::array<
+      std::array<std::pair<uint8_t, uint8_t>, DUNGEON_HEIGHT * 2>,
       DUNGEON_WIDTH * 2>
       screen_distance_direction_lookup;
-  std::string pluralize(std::string noun);
-  std::string replace_word(std::string input, std::string word,
-                           std::string replacement_word);
+  // (distance id, direction id) of each step of a ray in each DIRECTION.
+  inline static std::array<std::array<std::pair<uint8_t, uint8_t>, RAY_LENGTH>,
+                           direction_steps.size()>
+      ray_distance_direction_lookup;
+  // Glyphs of the visual view that stop a ray.
+  inline static std::bitset<MAX_GLYPH> visual_view_blocking;
+  // The token ids of phrase i are ids[offsets[i]:offsets[i + 1]].
+  struct PhraseTokens {
+    std::vector<int32_t> ids;
+    std::vector<uint32_t> offsets;
+    size_t size(size_t phrase) const {
+      return offsets[phrase + 1] - offsets[phrase];
+    }
+  };
+  // Set per instance by set_phrase_tokens, which replaces the whole table with
+  // the GIL held so token_glyphs can keep using the table it started with.
+  std::shared_ptr<const PhraseTokens> phrase_tokens;
+  std::string pluralize(std::string noun) const;
+  static GlyphScratch &glyph_scratch();
+  void group_glyph_records(GlyphScratch &scratch) const;
+  std::string describe_glyph_records(GlyphScratch &scratch,
+                                     const GlyphBudget &budget) const;
+  std::string glyphs_to_text(int16_t *glyphs_data, int64_t *blstats_data,
+                             const GlyphBudget &budget = GlyphBudget()) const;
+  std::string incremental_glyphs_to_text(int16_t *glyphs_data,
+                                         int64_t *blstats_data,
+                                         const GlyphBudget &budget);
+  std::string step_glyphs_to_text(int16_t *glyphs_data, int64_t *blstats_data,
+                                  const GlyphBudget &budget = GlyphBudget());
+
+  // The previous step of text_glyphs & text_all when incremental, used to skip
+  // the parts of the translation that can not have changed.
+  struct IncrementalState {
+    std::mutex mutex;
+    bool valid = false;
+    int64_t player_x = 0;
+    int64_t player_y = 0;
+    // (fullscreen name id, visual name id) of every cell.
+    std::array<std::pair<uint16_t, uint16_t>, DUNGEON_WIDTH * DUNGEON_HEIGHT>
+        cell_name_ids;
+    std::vector<GlyphRecord> fullscreen_records;
+    std::vector<GlyphRecord> visual_records;
+    GlyphBudget budget;
+    std::string text;
+  };
+  bool incremental;
+  IncrementalState incremental_state;
+  // Return latin-1 decoded str instead of bytes.
+  bool as_str;
+  py::object text_object(const std::string &text) const;
+  py::list text_objects(const std::vector<std::string> &texts) const;
+
+  // The last text of a field & its python object, returned again while the
+  // inputs that determine it are unchanged. Only used with the GIL held.
+  template <typename Key>
+  struct FieldCache {
+    bool valid = false;
+    Key key;
+    std::string output;
+    // Created from output when first needed.
+    py::object text;
+    uint64_t hits = 0;
+    uint64_t misses = 0;
+  };
+  using CursorKey = std::array<int64_t, 5>;
+  // The inventory bytes, only compared in full when their hashes are equal so
+  // that a hash collision can not return the text of another inventory.
+  struct InventoryKey {
+    size_t hash = 0;
+    std::string bytes;
+    bool operator==(const InventoryKey &other) const {
+      return hash == other.hash && bytes == other.bytes;
+    }
+  };
+  FieldCache<InventoryKey> inventory_cache;
+  FieldCache<CursorKey> cursor_cache;
+  template <typename Key, typename F>
+  const std::string &cached_output(FieldCache<Key> &cache, const Key &key,
+                                   F translate);
+  template <typename Key, typename F>
+  py::object cached_text(FieldCache<Key> &cache, const Key &key, F translate);
+  // Recently seen texts of the fields recomputed on every call, used by the
+  // single observation methods when the instance has cache_entries.
+  ContentCache glyphs_content_cache;
+  ContentCache message_content_cache;
+  ContentCache blstats_content_cache;
+  template <typename F>
+  std::string content_cached(ContentCache &cache, std::string key, F translate);
+  std::string cached_glyphs_to_text(int16_t *glyphs_data, size_t glyphs_size,
+                                    int64_t *blstats_data,
+                                    const GlyphBudget &budget = GlyphBudget());
+  std::string cached_message_to_text(uint8_t *tty_chars_data, size_t rows,
+                                     size_t columns);
+  std::string cached_blstats_to_text(int64_t *blstats_data,
+                                     size_t blstats_size);
+  InventoryKey inventory_key(uint8_t *inv_strs_data, uint8_t *inv_letters_data,
+                             size_t rows, size_t columns) const;
+  CursorKey cursor_key(int16_t *glyphs_data, size_t glyphs_size,
+                       int64_t *blstats_data, int64_t *tty_cursor_data) const;
+  std::string blstats_to_text(int64_t *blstats_data) const;
+  std::string inventory_to_text(uint8_t *inv_strs_data,
+                                uint8_t *inv_letters_data, size_t rows,
+                                size_t columns) const;
+  std::string cursor_to_text(int16_t *glyphs_data, size_t glyphs_size,
+                             int64_t *blstats_data,
+                             int64_t *tty_cursor_data) const;
+  std::string message_to_text(uint8_t *tty_chars_data, size_t rows,
+                              size_t columns) const;
+  template <typename F>
+  void run_batch(size_t batch_size, int num_threads, F translate);
 };
 
 void NLELanguageObsv::build_screen_pos_to_distance_direction() {
   for (uint64_t x = 0; x < DUNGEON_WIDTH * 2; x++) {
     for (uint64_t y = 0; y < DUNGEON_HEIGHT * 2; y++) {
-      screen_distance_direction_lookup[x][y] =
+      auto [distance, direction] =
           pos_to_str(x - DUNGEON_WIDTH, y - DUNGEON_HEIGHT);
+      uint8_t distance_id =
+          std::find(distance_names.begin(), distance_names.end(), distance) -
+          distance_names.begin();
+      uint8_t direction_id =
+          std::find(direction_names.begin(), direction_names.end(), direction) -
+          direction_names.begin();
+      screen_distance_direction_lookup[x][y] = {distance_id, direction_id};
     }
   }
 }
 
-NLELanguageObsv::NLELanguageObsv() {
-  // Initialize the lookup tables for glyphs & positions.
-  build_fullscreen_view_glyph_map();
-  build_visual_view_glyph_map();
-  build_screen_pos_to_distance_direction();
-  build_noun_plural_lookup();
+void NLELanguageObsv::build_ray_tables() {
+  for (size_t direction = 0; direction < direction_steps.size(); direction++) {
+    auto [step_x, step_y] = direction_steps[direction];
+    for (size_t step = 0; step < RAY_LENGTH; step++) {
+      int64_t offset = step + 1;
+      ray_distance_direction_lookup[direction][step] =
+          screen_distance_direction_lookup[step_x * offset + DUNGEON_WIDTH]
+                                          [-step_y * offset + DUNGEON_HEIGHT];
+    }
+  }
+  for (int16_t glyph = 0; glyph < MAX_GLYPH; glyph++) {
+    visual_view_blocking[glyph] =
+        blocking_view.find(visual_view_glyph_map[glyph]) != blocking_view.end();
+  }
 }
 
-void NLELanguageObsv::build_noun_plural_lookup() {
-  for (auto screen_it = fullscreen_view_glyph_map.begin();
-       screen_it != fullscreen_view_glyph_map.end(); ++screen_it) {
-    noun_plural_lookup[*screen_it] = pluralize(*screen_it);
+NLELanguageObsv::NLELanguageObsv(bool incremental, bool as_str,
+                                 size_t cache_entries, size_t cache_bytes)
+    : incremental(incremental),
+      as_str(as_str),
+      glyphs_content_cache(cache_entries, cache_bytes),
+      message_content_cache(cache_entries, cache_bytes),
+      blstats_content_cache(cache_entries, cache_bytes) {
+  // Initialize the lookup tables for glyphs & positions, once per process.
+  std::call_once(tables_built, [this] {
+    build_fullscreen_view_glyph_map();
+    build_visual_view_glyph_map();
+    build_screen_pos_to_distance_direction();
+    build_ray_tables();
+    build_glyph_name_ids();
+    build_glyph_phrases();
+  });
+}
+
+uint16_t NLELanguageObsv::glyph_name_id(const std::string &name) {
+  auto it = glyph_name_lookup.find(name);
+  if (it != glyph_name_lookup.end()) return it->second;
+  uint16_t name_id = glyph_names.size();
+  glyph_names.push_back(name);
+  glyph_name_lookup[name] = name_id;
+  return name_id;
+}
+
+void NLELanguageObsv::build_glyph_name_ids() {
+  glyph_name_id("");
+  for (int16_t glyph = 0; glyph < MAX_GLYPH; glyph++) {
+    fullscreen_view_name_ids[glyph] =
+        glyph_name_id(fullscreen_view_glyph_map[glyph]);
+    visual_view_name_ids[glyph] = glyph_name_id(visual_view_glyph_map[glyph]);
   }
-  for (auto near_it = visual_view_glyph_map.begin();
-       near_it != visual_view_glyph_map.end(); ++near_it) {
-    noun_plural_lookup[*near_it] = pluralize(*near_it);
+  // Plurals share the id space of the names, a mass noun is its own plural.
+  size_t singular_count = glyph_names.size();
+  plural_name_ids.resize(singular_count, 0);
+  for (size_t name_id = 1; name_id < singular_count; name_id++) {
+    plural_name_ids[name_id] = glyph_name_id(pluralize(glyph_names[name_id]));
   }
+
+  // A name takes the highest priority of the glyphs it describes, a plural
+  // that of its singular.
+  name_priorities.assign(glyph_names.size(), blocking_priority);
+  auto raise_priority = [](uint16_t name_id, uint8_t priority) {
+    if (priority < name_priorities[name_id])
+      name_priorities[name_id] = priority;
+  };
+  for (int16_t glyph = 0; glyph < MAX_GLYPH; glyph++) {
+    bool is_cmap = glyph >= GLYPH_CMAP_OFF && glyph < GLYPH_EXPLODE_OFF;
+    raise_priority(fullscreen_view_name_ids[glyph],
+                   is_cmap ? feature_priority : creature_object_priority);
+    raise_priority(visual_view_name_ids[glyph], visual_view_blocking[glyph]
+                                                    ? blocking_priority
+                                                    : feature_priority);
+  }
+  for (size_t name_id = 1; name_id < singular_count; name_id++)
+    raise_priority(plural_name_ids[name_id], name_priorities[name_id]);
+}
+
+void NLELanguageObsv::build_glyph_phrases() {
+  glyph_phrase_texts = glyph_names;
+  distance_phrase_begin = glyph_phrase_texts.size();
+  for (const std::string &distance : distance_names)
+    glyph_phrase_texts.push_back(" " + distance);
+  direction_phrase_begin = glyph_phrase_texts.size();
+  for (const std::string &direction : direction_names)
+    glyph_phrase_texts.push_back(" " + direction);
+  join_phrase_begin = glyph_phrase_texts.size();
+  for (const std::string &join : join_phrases)
+    glyph_phrase_texts.push_back(join);
 }
 
-std::string NLELanguageObsv::pluralize(std::string noun) {
+std::string NLELanguageObsv::pluralize(std::string noun) const {
   std::string plural;
   // Mass nouns
   if (noun.size() >= 5 && noun.substr(noun.size() - 5) == "boots")
@@ -362,212 +874,271 @@ std::string NLELanguageObsv::pluralize(std::string noun) {
   return plural;
 }
 
-std::list<std::tuple<std::string, std::string, std::string>>
-NLELanguageObsv::compress_by_glyph(
-    std::list<std::tuple<std::string, std::string, std::string>>
-        glyph_distance_direction) {
-  std::list<std::tuple<std::string, std::string, std::string>>
-      new_glyph_distance_direction;
-  std::list<std::pair<std::string, std::string>>
-      vector_glyh_distance_to_directions;
-  std::list<std::pair<std::string, std::string>>
-      new_vector_glyh_distance_to_directions;
-  std::map<std::pair<std::string, std::string>, std::list<std::string>>
-      map_glyh_distance_to_directions;
-
-  for (auto it = glyph_distance_direction.begin();
-       it != glyph_distance_direction.end(); it++) {
-    std::string glyph_string = std::get<0>(*it);
-    std::string distance_string = std::get<1>(*it);
-    std::string direction_string = std::get<2>(*it);
-
-    std::pair<std::string, std::string> glyph_distance_string_pair =
-        std::pair{glyph_string, distance_string};
-    // We use the vector to retain the sorted order.
-    if (map_glyh_distance_to_directions.find(glyph_distance_string_pair) ==
-        map_glyh_distance_to_directions.end()) {
-      vector_glyh_distance_to_directions.push_back(glyph_distance_string_pair);
+void NLELanguageObsv::compress_by_glyph(
+    const std::vector<GlyphRecord> &glyph_records,
+    GlyphScratch &scratch) const {
+  std::vector<int32_t> &name_slots = scratch.name_slots;
+  std::vector<GlyphGroup> &groups = scratch.groups;
+  std::vector<uint8_t> &direction_ids = scratch.direction_ids;
+  if (name_slots.size() < glyph_names.size())
+    name_slots.resize(glyph_names.size(), -1);
+  groups.clear();
+  direction_ids.clear();
+
+  // The records are sorted by distance so each distance is a contiguous block
+  // and every group of a block shares its distance.
+  size_t block_begin = 0;
+  while (block_begin < glyph_records.size()) {
+    uint8_t distance_id = glyph_records[block_begin].distance_id;
+    size_t block_end = block_begin;
+    while (block_end < glyph_records.size() &&
+           glyph_records[block_end].distance_id == distance_id) {
+      block_end++;
     }
-    map_glyh_distance_to_directions[glyph_distance_string_pair].push_back(
-        direction_string);
-  }
-  std::map<std::pair<std::string, std::string>, std::list<std::string>>
-      new_map_glyh_distance_to_directions;
-
-  for (auto it = vector_glyh_distance_to_directions.begin();
-       it != vector_glyh_distance_to_directions.end(); it++) {
-    std::string glyph_string = it->first;
-    std::string distance_string = it->second;
-    std::list<std::string> direction_strings =
-        map_glyh_distance_to_directions[*it];
-    std::unordered_map<std::string, int> direction_freq;
-    std::list<std::string> direction_freq_order;
-    std::list<std::string> multiple_in_direction;
-    std::list<std::string> single_direction_strings;
-
-    // For the current glyph & distance check the frequency of each direction.
-    for (auto direction_it = direction_strings.begin();
-         direction_it != direction_strings.end(); direction_it++) {
-      // Use a vector to preserve the order of the directions.
-      if (direction_freq.find(*direction_it) == direction_freq.end())
-        direction_freq_order.push_back(*direction_it);
-      direction_freq[*direction_it]++;
+
+    // Give every name a slot in order of first appearance and count its
+    // records.
+    scratch.slot_name_ids.clear();
+    scratch.slot_offsets.assign(1, 0);
+    for (size_t i = block_begin; i < block_end; i++) {
+      uint16_t name_id = glyph_records[i].name_id;
+      if (name_slots[name_id] < 0) {
+        name_slots[name_id] = scratch.slot_name_ids.size();
+        scratch.slot_name_ids.push_back(name_id);
+        scratch.slot_offsets.push_back(0);
+      }
+      scratch.slot_offsets[name_slots[name_id] + 1]++;
+    }
+    for (size_t slot = 1; slot < scratch.slot_offsets.size(); slot++) {
+      scratch.slot_offsets[slot] += scratch.slot_offsets[slot - 1];
     }
 
-    // For the current glyph & distance check if there is one distance or
-    // multiple.
-    for (auto direction_freq_it = direction_freq_order.begin();
-         direction_freq_it != direction_freq_order.end(); direction_freq_it++) {
-      if (direction_freq[*direction_freq_it] == 1)
-        single_direction_strings.push_back(*direction_freq_it);
-      else
-        multiple_in_direction.push_back(*direction_freq_it);
+    // Gather the directions of each slot, they stay sorted so repeated
+    // directions are adjacent.
+    scratch.slot_direction_ids.resize(block_end - block_begin);
+    for (size_t i = block_begin; i < block_end; i++) {
+      int32_t slot = name_slots[glyph_records[i].name_id];
+      scratch.slot_direction_ids[scratch.slot_offsets[slot]++] =
+          glyph_records[i].direction_id;
+    }
+    for (uint16_t name_id : scratch.slot_name_ids) name_slots[name_id] = -1;
+
+    // Directions seen once describe the glyph, directions seen more than once
+    // describe its plural.
+    size_t block_groups_begin = groups.size();
+    uint32_t slot_begin = 0;
+    for (size_t slot = 0; slot < scratch.slot_name_ids.size(); slot++) {
+      uint32_t slot_end = scratch.slot_offsets[slot];
+      uint16_t name_id = scratch.slot_name_ids[slot];
+      for (bool multiple : {false, true}) {
+        uint32_t directions_begin = direction_ids.size();
+        for (uint32_t run = slot_begin; run < slot_end;) {
+          uint32_t run_end = run + 1;
+          while (run_end < slot_end && scratch.slot_direction_ids[run_end] ==
+                                           scratch.slot_direction_ids[run]) {
+            run_end++;
+          }
+          if ((run_end - run > 1) == multiple)
+            direction_ids.push_back(scratch.slot_direction_ids[run]);
+          run = run_end;
+        }
+        if (direction_ids.size() > directions_begin) {
+          groups.push_back({multiple ? plural_name_ids[name_id] : name_id,
+                            distance_id, directions_begin,
+                            static_cast<uint32_t>(direction_ids.size())});
+        }
+      }
+      slot_begin = slot_end;
     }
 
-    if (single_direction_strings.size() > 0) {
-      new_vector_glyh_distance_to_directions.push_back(*it);
-      new_map_glyh_distance_to_directions[*it] = single_direction_strings;
+    // A plural can equal another name of the block, the group emitted last
+    // for a name gives the directions wherever that name appears.
+    for (size_t i = block_groups_begin; i < groups.size(); i++)
+      name_slots[groups[i].name_id] = i;
+    for (size_t i = block_groups_begin; i < groups.size(); i++) {
+      const GlyphGroup &last = groups[name_slots[groups[i].name_id]];
+      groups[i].directions_begin = last.directions_begin;
+      groups[i].directions_end = last.directions_end;
     }
-    if (multiple_in_direction.size() > 0) {
-      std::pair<std::string, std::string> glyph_distance_string_pair =
-          std::pair{noun_plural_lookup[glyph_string], distance_string};
-      new_vector_glyh_distance_to_directions.push_back(
-          glyph_distance_string_pair);
-      new_map_glyh_distance_to_directions[glyph_distance_string_pair] =
-          multiple_in_direction;
+    for (size_t i = block_groups_begin; i < groups.size(); i++)
+      name_slots[groups[i].name_id] = -1;
+
+    block_begin = block_end;
+  }
+}
+
+// Calls emit with the id of every phrase of the line of a group, in order.
+template <typename F>
+void NLELanguageObsv::for_each_group_phrase(const GlyphScratch &scratch,
+                                            const GlyphGroup &group,
+                                            F emit) const {
+  const uint8_t *direction_ids =
+      scratch.direction_ids.data() + group.directions_begin;
+  size_t direction_count = group.directions_end - group.directions_begin;
+  emit(group.name_id);
+  emit(distance_phrase_begin + group.distance_id);
+  emit(direction_phrase_begin + direction_ids[0]);
+  if (direction_count == 2) {
+    emit(join_phrase_begin + and_phrase);
+    emit(direction_phrase_begin + direction_ids[1]);
+  } else if (direction_count > 2) {
+    for (size_t i = 1; i + 1 < direction_count; i++) {
+      emit(join_phrase_begin + comma_phrase);
+      emit(direction_phrase_begin + direction_ids[i]);
     }
+    emit(join_phrase_begin + comma_phrase);
+    emit(join_phrase_begin + and_phrase);
+    emit(direction_phrase_begin + direction_ids[direction_count - 1]);
   }
-  vector_glyh_distance_to_directions = new_vector_glyh_distance_to_directions;
-  map_glyh_distance_to_directions = new_map_glyh_distance_to_directions;
-
-  for (auto it = vector_glyh_distance_to_directions.begin();
-       it != vector_glyh_distance_to_directions.end(); ++it) {
-    std::string glyph_string = it->first;
-    std::string distance_string = it->second;
-    std::list<std::string> direction_strings =
-        map_glyh_distance_to_directions[*it];
-
-    if (direction_strings.size() == 1) {
-      std::string first_direction = direction_strings.front();
-      new_glyph_distance_direction.push_back(
-          make_tuple(glyph_string, distance_string, first_direction));
-    } else if (direction_strings.size() == 2) {
-      std::string first_direction = direction_strings.front();
-      std::string second_direction = *std::next(direction_strings.begin());
-      std::string new_direction = first_direction + " and " + second_direction;
-      new_glyph_distance_direction.push_back(
-          make_tuple(glyph_string, distance_string, new_direction));
-    } else {
-      std::string last_direction = direction_strings.back();
-      std::string new_direction = direction_strings.front();
-      direction_strings.pop_back();
-      direction_strings.pop_front();
-      for (auto direction_strings_it = direction_strings.begin();
-           direction_strings_it != direction_strings.end();
-           ++direction_strings_it) {
-        new_direction += ", " + *direction_strings_it;
-      }
-      new_direction += ", and " + last_direction;
-      new_glyph_distance_direction.push_back(
-          make_tuple(glyph_string, distance_string, new_direction));
+}
+
+// Calls emit with the id of every phrase of the text, in order.
+template <typename F>
+void NLELanguageObsv::for_each_glyph_phrase(const GlyphScratch &scratch,
+                                            F emit) const {
+  for (size_t idx = 0; idx < scratch.groups.size(); idx++) {
+    if (idx > 0) emit(join_phrase_begin + newline_phrase);
+    for_each_group_phrase(scratch, scratch.groups[idx], emit);
+  }
+}
+
+// Drops the groups that do not fit the budget, lines are kept by priority then
+// distance, closest first, and the kept lines stay in their usual order.
+// phrase_size(phrase id) is the size of a phrase counted by budget.max_size.
+template <typename F>
+void NLELanguageObsv::select_glyph_groups(GlyphScratch &scratch,
+                                          const GlyphBudget &budget,
+                                          F phrase_size) const {
+  std::vector<GlyphGroup> &groups = scratch.groups;
+  if (budget == GlyphBudget()) return;
+
+  // Counting sort of the groups on (priority, closeness).
+  const size_t distance_count = distance_names.size();
+  std::array<uint32_t, priority_count * distance_names.size() + 1>
+      bucket_start{};
+  auto bucket = [&](const GlyphGroup &group) {
+    return name_priorities[group.name_id] * distance_count + distance_count -
+           1 - group.distance_id;
+  };
+  for (const GlyphGroup &group : groups) bucket_start[bucket(group) + 1]++;
+  for (size_t i = 1; i < bucket_start.size(); i++)
+    bucket_start[i] += bucket_start[i - 1];
+  scratch.group_order.resize(groups.size());
+  for (size_t i = 0; i < groups.size(); i++)
+    scratch.group_order[bucket_start[bucket(groups[i])]++] = i;
+
+  scratch.group_kept.assign(groups.size(), 0);
+  size_t newline_size = phrase_size(join_phrase_begin + newline_phrase);
+  size_t line_count = 0;
+  size_t size = 0;
+  for (uint32_t group_idx : scratch.group_order) {
+    if (line_count == budget.max_lines) break;
+    size_t line_size = line_count > 0 ? newline_size : 0;
+    for_each_group_phrase(scratch, groups[group_idx], [&](size_t phrase) {
+      line_size += phrase_size(phrase);
+    });
+    if (line_size > budget.max_size - size) break;
+    size += line_size;
+    line_count++;
+    scratch.group_kept[group_idx] = 1;
+  }
+
+  size_t kept = 0;
+  for (size_t i = 0; i < groups.size(); i++)
+    if (scratch.group_kept[i]) groups[kept++] = groups[i];
+  groups.resize(kept);
+}
+
+GlyphBudget NLELanguageObsv::glyph_budget(std::optional<size_t> max_lines,
+                                          std::optional<size_t> max_size) {
+  return {max_lines.value_or(SIZE_MAX), max_size.value_or(SIZE_MAX)};
+}
+
+void NLELanguageObsv::render_glyph_groups(const GlyphScratch &scratch,
+                                          std::string &output) const {
+  output.clear();
+  for_each_glyph_phrase(
+      scratch, [&](size_t phrase) { output += glyph_phrase_texts[phrase]; });
+}
+
+size_t NLELanguageObsv::render_glyph_tokens(const GlyphScratch &scratch,
+                                            const PhraseTokens &tokens,
+                                            int32_t *input_ids,
+                                            size_t capacity) const {
+  size_t count = 0;
+  for_each_glyph_phrase(scratch, [&](size_t phrase) {
+    for (uint32_t i = tokens.offsets[phrase]; i < tokens.offsets[phrase + 1];
+         i++) {
+      if (count < capacity) input_ids[count] = tokens.ids[i];
+      count++;
     }
+  });
+  return count;
+}
+
+py::list NLELanguageObsv::glyph_phrases() {
+  py::list output;
+  for (const std::string &phrase : glyph_phrase_texts)
+    output.append(py::bytes(phrase));
+  return output;
+}
+
+void NLELanguageObsv::set_phrase_tokens(
+    std::vector<std::vector<int32_t>> token_ids) {
+  if (token_ids.size() != glyph_phrase_texts.size()) {
+    throw std::invalid_argument(
+        "phrase_tokens has " + std::to_string(token_ids.size()) +
+        " phrases, expected " + std::to_string(glyph_phrase_texts.size()));
   }
-  return new_glyph_distance_direction;
-}
-
-std::pair<int, int> NLELanguageObsv::local_glyph_to_global(int glyph_idx,
-                                                           int player_x,
-                                                           int player_y) {
-  int glyph_x = glyph_idx % DUNGEON_WIDTH;
-  int glyph_y = glyph_idx / DUNGEON_WIDTH;
-  int glyph_relative_x = glyph_x - player_x;
-  int glyph_relative_y = -glyph_y + player_y;
-
-  int glyph_relative_start_0_x = glyph_relative_x + DUNGEON_WIDTH;
-  int glyph_relative_start_0_y = glyph_relative_y + DUNGEON_HEIGHT;
-
-  return std::pair{glyph_relative_start_0_x, glyph_relative_start_0_y};
-}
-
-std::list<std::tuple<std::string, std::string, std::string>>
-NLELanguageObsv::sort_by_distance_direction(
-    std::list<std::tuple<std::string, std::string, std::string>>
-        glyph_distance_direction) {
-  std::list<std::tuple<std::string, std::string, std::string>>
-      new_glyph_distance_direction;
-  const std::array<std::string, 5> distance_order = {"very far", "far", "near",
-                                                     "very near", "adjacent"};
-  const std::array<std::string, 16> direction_order = {
-      "north", "northnortheast", "northeast", "eastnortheast",
-      "east",  "eastsoutheast",  "southeast", "southsoutheast",
-      "south", "southsouthwest", "southwest", "westsouthwest",
-      "west",  "westnorthwest",  "northwest", "northnorthwest"};
-
-  for (auto distances_it = distance_order.begin();
-       distances_it != distance_order.end(); ++distances_it) {
-    for (auto directions_it = direction_order.begin();
-         directions_it != direction_order.end(); ++directions_it) {
-      for (auto it = glyph_distance_direction.begin();
-           it != glyph_distance_direction.end(); ++it) {
-        std::string distance_string = std::get<1>(*it);
-        std::string direction_string = std::get<2>(*it);
-
-        if (distance_string == *distances_it &&
-            direction_string == *directions_it) {
-          new_glyph_distance_direction.push_back(*it);
-        }
-      }
+  auto tokens = std::make_shared<PhraseTokens>();
+  tokens->offsets.assign(1, 0);
+  for (const std::vector<int32_t> &phrase_ids : token_ids) {
+    tokens->ids.insert(tokens->ids.end(), phrase_ids.begin(), phrase_ids.end());
+    tokens->offsets.push_back(tokens->ids.size());
+  }
+  phrase_tokens = std::move(tokens);
+}
+
+void NLELanguageObsv::sort_by_distance_direction(
+    const std::vector<GlyphRecord> &glyph_records,
+    std::vector<GlyphRecord> &sorted_records) const {
+  // Counting sort on distance then direction, stable within each bucket.
+  // The last direction is the player position which is never described.
+  const size_t direction_count = direction_names.size() - 1;
+  std::array<size_t, distance_names.size() * (direction_names.size() - 1) + 1>
+      bucket_start{};
+
+  for (const GlyphRecord &record : glyph_records) {
+    if (record.direction_id < direction_count) {
+      bucket_start[record.distance_id * direction_count + record.direction_id +
+                   1]++;
     }
   }
-  return new_glyph_distance_direction;
-}
-
-std::list<std::tuple<std::string, std::string, std::string>>
-NLELanguageObsv::ray_march(DIRECTION direction, int64_t player_x,
-                           int64_t player_y, int16_t *glyphs_data) {
-  std::list<std::tuple<std::string, std::string, std::string>>
-      glyph_distance_direction;
-  std::string glyph_string;
-  std::string direction_string;
-  std::string distance_string;
-
-  for (uint64_t offset = 1; offset < 10; offset++) {
-    int64_t glyph_x = 0, glyph_y = 0;
-
-    switch (direction) {
-      case east:
-        glyph_x = player_x + offset;
-        glyph_y = player_y;
-        break;
-      case southeast:
-        glyph_x = player_x + offset;
-        glyph_y = player_y + offset;
-        break;
-      case south:
-        glyph_x = player_x;
-        glyph_y = player_y + offset;
-        break;
-      case southwest:
-        glyph_x = player_x - offset;
-        glyph_y = player_y + offset;
-        break;
-      case west:
-        glyph_x = player_x - offset;
-        glyph_y = player_y;
-        break;
-      case northwest:
-        glyph_x = player_x - offset;
-        glyph_y = player_y - offset;
-        break;
-      case north:
-        glyph_x = player_x;
-        glyph_y = player_y - offset;
-        break;
-      case northeast:
-        glyph_x = player_x + offset;
-        glyph_y = player_y - offset;
-        break;
+  for (size_t bucket = 1; bucket < bucket_start.size(); bucket++) {
+    bucket_start[bucket] += bucket_start[bucket - 1];
+  }
+
+  sorted_records.resize(bucket_start.back());
+  for (const GlyphRecord &record : glyph_records) {
+    if (record.direction_id < direction_count) {
+      size_t bucket =
+          record.distance_id * direction_count + record.direction_id;
+      sorted_records[bucket_start[bucket]++] = record;
     }
+  }
+}
+
+template <typename F>
+void NLELanguageObsv::ray_march(DIRECTION direction, int64_t player_x,
+                                int64_t player_y, int16_t *glyphs_data,
+                                F emit) const {
+  auto [step_x, step_y] = direction_steps[direction];
+  const auto &ray = ray_distance_direction_lookup[direction];
+  int64_t glyph_x = player_x;
+  int64_t glyph_y = player_y;
+  for (size_t step = 0; step < RAY_LENGTH; step++) {
+    glyph_x += step_x;
+    glyph_y += step_y;
 
     // Avoid out of range of range
     if ((glyph_x >= DUNGEON_WIDTH || glyph_x < 0) ||
@@ -575,102 +1146,126 @@ NLELanguageObsv::ray_march(DIRECTION direction, int64_t player_x,
       break;
 
     int64_t glyph_idx = glyph_x + glyph_y * DUNGEON_WIDTH;
-    auto [glyph_relative_start_0_x, glyph_relative_start_0_y] =
-        local_glyph_to_global(glyph_idx, player_x, player_y);
-
     int glyph = glyphs_data[glyph_idx];
-    std::string glyph_value = visual_view_glyph_map[glyph];
-    if (fullscreen_view_glyph_map[glyph].size() == 0 &&
-        glyph_value.size() > 0) {
-      glyph_string = glyph_value;
-      direction_string =
-          screen_distance_direction_lookup[glyph_relative_start_0_x]
-                                          [glyph_relative_start_0_y]
-                                              .first;
-      distance_string =
-          screen_distance_direction_lookup[glyph_relative_start_0_x]
-                                          [glyph_relative_start_0_y]
-                                              .second;
-      glyph_distance_direction.push_back(
-          std::make_tuple(glyph_string, direction_string, distance_string));
-      if (blocking_view.find(glyph_value) != blocking_view.end()) {
-        break;
-      }
+    uint16_t name_id = visual_view_name_ids[glyph];
+    if (fullscreen_view_name_ids[glyph] == 0 && name_id != 0) {
+      auto [distance_id, direction_id] = ray[step];
+      emit(glyph_idx, GlyphRecord{name_id, distance_id, direction_id});
+      if (visual_view_blocking[glyph]) break;
     }
   }
-  return glyph_distance_direction;
 }
 
-std::list<std::tuple<std::string, std::string, std::string>>
-NLELanguageObsv::fullscreen_view(int16_t *glyphs_data, int64_t *blstats_data) {
+template <typename F>
+void NLELanguageObsv::for_each_fullscreen_glyph(int16_t *glyphs_data,
+                                                int64_t *blstats_data,
+                                                F emit) const {
   int64_t player_x = blstats_data[0];
   int64_t player_y = blstats_data[1];
 
-  std::list<std::tuple<std::string, std::string, std::string>>
-      glyph_distance_direction;
-  std::string glyph_string;
-  std::string direction_string;
-  std::string distance_string;
-
-  int16_t glyph;
-  int64_t glyph_relative_start_0_x;
-  int64_t glyph_relative_start_0_y;
-
-  int64_t glyph_x;
-  int64_t glyph_y;
-  for (int64_t i = 0; i < DUNGEON_WIDTH * DUNGEON_HEIGHT; i++) {
-    glyph = glyphs_data[i];
-    std::string glyph_value = fullscreen_view_glyph_map[glyph];
-
-    if (glyph_value.size() > 0) {
-      glyph_x = i % DUNGEON_WIDTH;
-      glyph_y = i / DUNGEON_WIDTH;
-      int glyph_relative_x = glyph_x - player_x;
-      int glyph_relative_y = -glyph_y + player_y;
+  // Most of the map is a few uninteresting glyphs (dark area, floor,
+  // corridor). Four cells at a time are skipped when they repeat the last
+  // uninteresting glyph, or when none of them has a name, so the per-cell work
+  // below only runs for the few cells that are described.
+  const int64_t cell_count = DUNGEON_WIDTH * DUNGEON_HEIGHT;
+  const int64_t block_count = cell_count / 4 * 4;
+  uint64_t skip_word = ~uint64_t{0};
+  for (int64_t block = 0; block < cell_count; block += 4) {
+    int64_t block_end = block + 4;
+    if (block < block_count) {
+      uint64_t word;
+      std::memcpy(&word, glyphs_data + block, sizeof(word));
+      if (word == skip_word) continue;
+      if ((fullscreen_view_name_ids[glyphs_data[block]] |
+           fullscreen_view_name_ids[glyphs_data[block + 1]] |
+           fullscreen_view_name_ids[glyphs_data[block + 2]] |
+           fullscreen_view_name_ids[glyphs_data[block + 3]]) == 0) {
+        skip_word = uint16_t(glyphs_data[block + 3]) * 0x0001000100010001ull;
+        continue;
+      }
+    } else {
+      block_end = cell_count;
+    }
+    for (int64_t i = block; i < block_end; i++) {
+      uint16_t name_id = fullscreen_view_name_ids[glyphs_data[i]];
+      if (name_id == 0) continue;
+      int64_t glyph_relative_x = i % DUNGEON_WIDTH - player_x;
+      int64_t glyph_relative_y = -(i / DUNGEON_WIDTH) + player_y;
 
       // Skip player
       if (glyph_relative_x == 0 && glyph_relative_y == 0) continue;
 
-      glyph_string = glyph_value;
-
-      glyph_relative_start_0_x = glyph_relative_x + DUNGEON_WIDTH;
-      glyph_relative_start_0_y = glyph_relative_y + DUNGEON_HEIGHT;
-
-      distance_string =
-          screen_distance_direction_lookup[glyph_relative_start_0_x]
-                                          [glyph_relative_start_0_y]
-                                              .first;
-      direction_string =
-          screen_distance_direction_lookup[glyph_relative_start_0_x]
-                                          [glyph_relative_start_0_y]
-                                              .second;
-      glyph_distance_direction.push_back(
-          std::make_tuple(glyph_string, distance_string, direction_string));
+      auto [distance_id, direction_id] =
+          screen_distance_direction_lookup[glyph_relative_x + DUNGEON_WIDTH]
+                                          [glyph_relative_y + DUNGEON_HEIGHT];
+      emit(i, GlyphRecord{name_id, distance_id, direction_id});
     }
   }
-  return glyph_distance_direction;
 }
 
-std::list<std::tuple<std::string, std::string, std::string>>
-NLELanguageObsv::visual_view(int16_t *glyphs_data, int64_t *blstats_data) {
+template <typename F>
+void NLELanguageObsv::for_each_visual_glyph(int16_t *glyphs_data,
+                                            int64_t *blstats_data,
+                                            F emit) const {
   int64_t player_x = blstats_data[0];
   int64_t player_y = blstats_data[1];
 
-  std::list<std::tuple<std::string, std::string, std::string>>
-      glyph_distance_direction;
-  std::string glyph_string;
-  std::string direction_string;
-  std::string distance_string;
-
-  std::vector<DIRECTION> directions = {east, southeast, south, southwest,
-                                       west, northwest, north, northeast};
+  static constexpr std::array<DIRECTION, 8> directions = {
+      east, southeast, south, southwest, west, northwest, north, northeast};
 
   for (auto it = directions.begin(); it != directions.end(); ++it) {
-    glyph_distance_direction.splice(
-        glyph_distance_direction.end(),
-        ray_march(*it, player_x, player_y, glyphs_data));
+    ray_march(*it, player_x, player_y, glyphs_data, emit);
   }
-  return glyph_distance_direction;
+}
+
+void NLELanguageObsv::fullscreen_view(
+    int16_t *glyphs_data, int64_t *blstats_data,
+    std::vector<GlyphRecord> &glyph_records) const {
+  for_each_fullscreen_glyph(glyphs_data, blstats_data,
+                            [&](int64_t, const GlyphRecord &record) {
+                              glyph_records.push_back(record);
+                            });
+}
+
+void NLELanguageObsv::visual_view(
+    int16_t *glyphs_data, int64_t *blstats_data,
+    std::vector<GlyphRecord> &glyph_records) const {
+  for_each_visual_glyph(glyphs_data, blstats_data,
+                        [&](int64_t, const GlyphRecord &record) {
+                          glyph_records.push_back(record);
+                        });
+}
+
+py::array_t<NLELanguageObsv::StructuredGlyph>
+NLELanguageObsv::structured_glyphs(py::array_t<int16_t> glyphs,
+                                   py::array_t<int64_t> blstats) {
+  py::buffer_info glyphs_buffer = glyphs.request();
+  py::buffer_info blstats_buffer = blstats.request();
+
+  int16_t *glyphs_data = reinterpret_cast<int16_t *>(glyphs_buffer.ptr);
+  int64_t *blstats_data = reinterpret_cast<int64_t *>(blstats_buffer.ptr);
+  int64_t player_x = blstats_data[0];
+  int64_t player_y = blstats_data[1];
+
+  std::vector<StructuredGlyph> output;
+  {
+    py::gil_scoped_release release;
+    auto collect = [&](uint8_t source) {
+      return [&, source](int64_t glyph_idx, const GlyphRecord &record) {
+        output.push_back(
+            {glyphs_data[glyph_idx],
+             static_cast<int8_t>(glyph_idx % DUNGEON_WIDTH - player_x),
+             static_cast<int8_t>(glyph_idx / DUNGEON_WIDTH - player_y),
+             record.distance_id, record.direction_id, source});
+      };
+    };
+    for_each_fullscreen_glyph(glyphs_data, blstats_data, collect(0));
+    for_each_visual_glyph(glyphs_data, blstats_data, collect(1));
+  }
+  py::array_t<StructuredGlyph> array(output.size());
+  std::memcpy(array.mutable_data(), output.data(),
+              output.size() * sizeof(StructuredGlyph));
+  return array;
 }
 
 void NLELanguageObsv::build_visual_view_glyph_map() {
@@ -842,9 +1437,9 @@ void NLELanguageObsv::build_fullscreen_view_glyph_map() {
   }
 }
 
-py::bytes NLELanguageObsv::text_cursor(py::array_t<int16_t> glyphs,
-                                       py::array_t<int64_t> blstats,
-                                       py::array_t<int64_t> tty_cursor) {
+py::object NLELanguageObsv::text_cursor(py::array_t<int16_t> glyphs,
+                                        py::array_t<int64_t> blstats,
+                                        py::array_t<int64_t> tty_cursor) {
   py::buffer_info glyphs_buffer = glyphs.request();
   py::buffer_info blstats_buffer = blstats.request();
   py::buffer_info tty_cursor_buffer = tty_cursor.request();
@@ -853,6 +1448,33 @@ py::bytes NLELanguageObsv::text_cursor(py::array_t<int16_t> glyphs,
   int64_t *blstats_data = reinterpret_cast<int64_t *>(blstats_buffer.ptr);
   int64_t *tty_cursor_data = reinterpret_cast<int64_t *>(tty_cursor_buffer.ptr);
 
+  size_t glyphs_size = glyphs.size();
+
+  CursorKey key =
+      cursor_key(glyphs_data, glyphs_size, blstats_data, tty_cursor_data);
+  return cached_text(cursor_cache, key, [&] {
+    return cursor_to_text(glyphs_data, glyphs_size, blstats_data,
+                          tty_cursor_data);
+  });
+}
+
+NLELanguageObsv::CursorKey NLELanguageObsv::cursor_key(
+    int16_t *glyphs_data, size_t glyphs_size, int64_t *blstats_data,
+    int64_t *tty_cursor_data) const {
+  // The player & cursor positions and the glyph under the cursor.
+  int64_t glyph_idx =
+      tty_cursor_data[1] + (tty_cursor_data[0] - 1) * DUNGEON_WIDTH;
+  int64_t glyph = -1;
+  if (glyph_idx > 0 && glyph_idx < static_cast<int64_t>(glyphs_size))
+    glyph = glyphs_data[glyph_idx];
+  return {blstats_data[0], blstats_data[1], tty_cursor_data[0],
+          tty_cursor_data[1], glyph};
+}
+
+std::string NLELanguageObsv::cursor_to_text(int16_t *glyphs_data,
+                                            size_t glyphs_size,
+                                            int64_t *blstats_data,
+                                            int64_t *tty_cursor_data) const {
   int64_t player_x = blstats_data[0];
   int64_t player_y = blstats_data[1];
   int64_t cursor_x = tty_cursor_data[1];
@@ -871,8 +1493,8 @@ py::bytes NLELanguageObsv::text_cursor(py::array_t<int16_t> glyphs,
       (glyph_relative_start_0_x < DUNGEON_WIDTH * 2) &&
       (glyph_relative_start_0_y >= 0) &&
       (glyph_relative_start_0_y < DUNGEON_HEIGHT * 2) && (glyph_idx > 0) &&
-      (glyph_idx < glyphs.size())) {
-    std::pair<std::string, std::string> distance_direction =
+      (glyph_idx < static_cast<int64_t>(glyphs_size))) {
+    auto [distance_id, direction_id] =
         screen_distance_direction_lookup[glyph_relative_start_0_x]
                                         [glyph_relative_start_0_y];
 
@@ -883,63 +1505,290 @@ py::bytes NLELanguageObsv::text_cursor(py::array_t<int16_t> glyphs,
     if (glyph_relative_x == 0 && glyph_relative_y == 0) {
       output = "Yourself a " + glyph_string;
     } else {
-      output = distance_direction.first + " " + distance_direction.second +
-               " " + glyph_string;
+      output = distance_names[distance_id] + " " +
+               direction_names[direction_id] + " " + glyph_string;
     }
   } else {
     output = "";
   }
 
-  return py::bytes(output);
+  return output;
 }
 
-py::bytes NLELanguageObsv::text_glyphs(py::array_t<int16_t> glyphs,
-                                       py::array_t<int64_t> blstats) {
+py::object NLELanguageObsv::text_glyphs(py::array_t<int16_t> glyphs,
+                                        py::array_t<int64_t> blstats,
+                                        std::optional<size_t> max_lines,
+                                        std::optional<size_t> max_chars) {
   py::buffer_info glyphs_buffer = glyphs.request();
   py::buffer_info blstats_buffer = blstats.request();
 
   int16_t *glyphs_data = reinterpret_cast<int16_t *>(glyphs_buffer.ptr);
   int64_t *blstats_data = reinterpret_cast<int64_t *>(blstats_buffer.ptr);
 
-  std::list<std::tuple<std::string, std::string, std::string>>
-      glyph_distance_direction;
+  std::string output;
+  {
+    py::gil_scoped_release release;
+    output = cached_glyphs_to_text(glyphs_data, glyphs.size(), blstats_data,
+                                   glyph_budget(max_lines, max_chars));
+  }
+  return text_object(output);
+}
 
-  glyph_distance_direction.splice(glyph_distance_direction.end(),
-                                  fullscreen_view(glyphs_data, blstats_data));
-  glyph_distance_direction.splice(glyph_distance_direction.end(),
-                                  visual_view(glyphs_data, blstats_data));
+NLELanguageObsv::GlyphScratch &NLELanguageObsv::glyph_scratch() {
+  thread_local GlyphScratch scratch;
+  return scratch;
+}
 
-  glyph_distance_direction =
-      sort_by_distance_direction(glyph_distance_direction);
+std::string NLELanguageObsv::glyphs_to_text(int16_t *glyphs_data,
+                                            int64_t *blstats_data,
+                                            const GlyphBudget &budget) const {
+  GlyphScratch &scratch = glyph_scratch();
+  scratch.records.clear();
+  fullscreen_view(glyphs_data, blstats_data, scratch.records);
+  visual_view(glyphs_data, blstats_data, scratch.records);
+  return describe_glyph_records(scratch, budget);
+}
 
-  glyph_distance_direction = compress_by_glyph(glyph_distance_direction);
+std::string NLELanguageObsv::incremental_glyphs_to_text(
+    int16_t *glyphs_data, int64_t *blstats_data, const GlyphBudget &budget) {
+  std::lock_guard<std::mutex> lock(incremental_state.mutex);
+  IncrementalState &state = incremental_state;
+  int64_t player_x = blstats_data[0];
+  int64_t player_y = blstats_data[1];
 
-  std::string output = "";
-  uint64_t idx = 0;
-  for (auto it = glyph_distance_direction.begin();
-       it != glyph_distance_direction.end(); it++) {
-    std::string glyphs_string = std::get<0>(*it);
-    std::string distance_string = std::get<1>(*it);
-    std::string directions_string = std::get<2>(*it);
-    output += glyphs_string + " " + distance_string;
-    output += " ";
-    output += directions_string;
-    if (idx + 1 < (glyph_distance_direction.size())) output += "\n";
-    idx++;
+  // Every record depends on the player position.
+  bool moved =
+      !state.valid || player_x != state.player_x || player_y != state.player_y;
+  bool fullscreen_changed = moved;
+  bool visual_changed = moved;
+  for (int64_t i = 0; i < DUNGEON_WIDTH * DUNGEON_HEIGHT; i++) {
+    std::pair<uint16_t, uint16_t> name_ids{
+        fullscreen_view_name_ids[glyphs_data[i]],
+        visual_view_name_ids[glyphs_data[i]]};
+    if (name_ids == state.cell_name_ids[i]) continue;
+    if (name_ids.first != 0 || state.cell_name_ids[i].first != 0)
+      fullscreen_changed = true;
+    // The rays only reach 9 cells along the 8 directions from the player.
+    int64_t dx = abs(i % DUNGEON_WIDTH - player_x);
+    int64_t dy = abs(i / DUNGEON_WIDTH - player_y);
+    if (max(dx, dy) < 10 && (dx == 0 || dy == 0 || dx == dy))
+      visual_changed = true;
+    state.cell_name_ids[i] = name_ids;
+  }
+  if (!fullscreen_changed && !visual_changed && budget == state.budget)
+    return state.text;
+
+  state.valid = true;
+  state.player_x = player_x;
+  state.player_y = player_y;
+  if (fullscreen_changed) {
+    state.fullscreen_records.clear();
+    fullscreen_view(glyphs_data, blstats_data, state.fullscreen_records);
+  }
+  if (visual_changed) {
+    state.visual_records.clear();
+    visual_view(glyphs_data, blstats_data, state.visual_records);
   }
-  return py::bytes(output);
+
+  GlyphScratch &scratch = glyph_scratch();
+  scratch.records = state.fullscreen_records;
+  scratch.records.insert(scratch.records.end(), state.visual_records.begin(),
+                         state.visual_records.end());
+  state.budget = budget;
+  state.text = describe_glyph_records(scratch, budget);
+  return state.text;
+}
+
+std::string NLELanguageObsv::step_glyphs_to_text(int16_t *glyphs_data,
+                                                 int64_t *blstats_data,
+                                                 const GlyphBudget &budget) {
+  if (incremental)
+    return incremental_glyphs_to_text(glyphs_data, blstats_data, budget);
+  return glyphs_to_text(glyphs_data, blstats_data, budget);
+}
+
+template <typename F>
+std::string NLELanguageObsv::content_cached(ContentCache &cache,
+                                            std::string key, F translate) {
+  uint64_t hash = hash_bytes(key);
+  std::string output;
+  if (cache.find(key, hash, output)) return output;
+  output = translate();
+  cache.insert(std::move(key), hash, output);
+  return output;
+}
+
+std::string NLELanguageObsv::cached_glyphs_to_text(int16_t *glyphs_data,
+                                                   size_t glyphs_size,
+                                                   int64_t *blstats_data,
+                                                   const GlyphBudget &budget) {
+  if (!glyphs_content_cache.enabled())
+    return step_glyphs_to_text(glyphs_data, blstats_data, budget);
+  // The description only depends on the player position of blstats.
+  std::string key;
+  key.reserve(glyphs_size * sizeof(int16_t) + 4 * sizeof(int64_t));
+  append_bytes(key, glyphs_data, glyphs_size * sizeof(int16_t));
+  append_bytes(key, blstats_data, 2 * sizeof(int64_t));
+  append_bytes(key, &budget.max_lines, sizeof(budget.max_lines));
+  append_bytes(key, &budget.max_size, sizeof(budget.max_size));
+  return content_cached(glyphs_content_cache, std::move(key), [&] {
+    return step_glyphs_to_text(glyphs_data, blstats_data, budget);
+  });
+}
+
+std::string NLELanguageObsv::cached_message_to_text(uint8_t *tty_chars_data,
+                                                    size_t rows,
+                                                    size_t columns) {
+  if (!message_content_cache.enabled())
+    return message_to_text(tty_chars_data, rows, columns);
+  std::string key;
+  key.reserve(rows * columns + sizeof(columns));
+  append_bytes(key, tty_chars_data, rows * columns);
+  append_bytes(key, &columns, sizeof(columns));
+  return content_cached(message_content_cache, std::move(key), [&] {
+    return message_to_text(tty_chars_data, rows, columns);
+  });
 }
 
-py::bytes NLELanguageObsv::text_inventory(py::array_t<uint8_t> inv_strs,
-                                          py::array_t<uint8_t> inv_letters) {
+std::string NLELanguageObsv::cached_blstats_to_text(int64_t *blstats_data,
+                                                    size_t blstats_size) {
+  if (!blstats_content_cache.enabled()) return blstats_to_text(blstats_data);
+  std::string key;
+  append_bytes(key, blstats_data, blstats_size * sizeof(int64_t));
+  return content_cached(blstats_content_cache, std::move(key),
+                        [&] { return blstats_to_text(blstats_data); });
+}
+
+void NLELanguageObsv::reset() {
+  std::lock_guard<std::mutex> lock(incremental_state.mutex);
+  incremental_state.valid = false;
+}
+
+void NLELanguageObsv::group_glyph_records(GlyphScratch &scratch) const {
+  sort_by_distance_direction(scratch.records, scratch.sorted_records);
+  compress_by_glyph(scratch.sorted_records, scratch);
+}
+
+std::string NLELanguageObsv::describe_glyph_records(
+    GlyphScratch &scratch, const GlyphBudget &budget) const {
+  group_glyph_records(scratch);
+  select_glyph_groups(scratch, budget, [&](size_t phrase) {
+    return glyph_phrase_texts[phrase].size();
+  });
+
+  // Text is only produced here, from the compressed glyph groups.
+  render_glyph_groups(scratch, scratch.text);
+  return scratch.text;
+}
+
+size_t NLELanguageObsv::token_glyphs(
+    py::array_t<int16_t> glyphs, py::array_t<int64_t> blstats,
+    py::array_t<int32_t, py::array::c_style> input_ids,
+    std::optional<size_t> max_lines, std::optional<size_t> max_tokens) {
+  std::shared_ptr<const PhraseTokens> tokens = phrase_tokens;
+  if (!tokens) {
+    throw std::runtime_error(
+        "set_phrase_tokens must be called before token_glyphs");
+  }
+  py::buffer_info glyphs_buffer = glyphs.request();
+  py::buffer_info blstats_buffer = blstats.request();
+  py::buffer_info input_ids_buffer = input_ids.request(true);
+
+  int16_t *glyphs_data = reinterpret_cast<int16_t *>(glyphs_buffer.ptr);
+  int64_t *blstats_data = reinterpret_cast<int64_t *>(blstats_buffer.ptr);
+  int32_t *input_ids_data = reinterpret_cast<int32_t *>(input_ids_buffer.ptr);
+  size_t capacity = input_ids_buffer.size;
+
+  py::gil_scoped_release release;
+  GlyphScratch &scratch = glyph_scratch();
+  scratch.records.clear();
+  fullscreen_view(glyphs_data, blstats_data, scratch.records);
+  visual_view(glyphs_data, blstats_data, scratch.records);
+  group_glyph_records(scratch);
+  select_glyph_groups(scratch, glyph_budget(max_lines, max_tokens),
+                      [&](size_t phrase) { return tokens->size(phrase); });
+  return render_glyph_tokens(scratch, *tokens, input_ids_data, capacity);
+}
+
+py::object NLELanguageObsv::text_inventory(py::array_t<uint8_t> inv_strs,
+                                           py::array_t<uint8_t> inv_letters) {
   py::buffer_info inv_strs_buffer = inv_strs.request();
   py::buffer_info inv_letters_buffer = inv_letters.request();
   uint8_t *inv_strs_data = reinterpret_cast<uint8_t *>(inv_strs_buffer.ptr);
   uint8_t *inv_letters_data =
       reinterpret_cast<uint8_t *>(inv_letters_buffer.ptr);
-  size_t x = inv_strs_buffer.shape[0];
-  size_t y = inv_strs_buffer.shape[1];
 
+  size_t rows = inv_strs_buffer.shape[0];
+  size_t columns = inv_strs_buffer.shape[1];
+
+  InventoryKey key;
+  {
+    py::gil_scoped_release release;
+    key = inventory_key(inv_strs_data, inv_letters_data, rows, columns);
+  }
+  return cached_text(inventory_cache, key, [&] {
+    return inventory_to_text(inv_strs_data, inv_letters_data, rows, columns);
+  });
+}
+
+NLELanguageObsv::InventoryKey NLELanguageObsv::inventory_key(
+    uint8_t *inv_strs_data, uint8_t *inv_letters_data, size_t rows,
+    size_t columns) const {
+  InventoryKey key;
+  key.bytes.reserve(rows + rows * columns);
+  append_bytes(key.bytes, inv_letters_data, rows);
+  append_bytes(key.bytes, inv_strs_data, rows * columns);
+  key.hash = hash_bytes(key.bytes);
+  return key;
+}
+
+template <typename Key, typename F>
+const std::string &NLELanguageObsv::cached_output(FieldCache<Key> &cache,
+                                                  const Key &key, F translate) {
+  if (cache.valid && cache.key == key) {
+    cache.hits++;
+    return cache.output;
+  }
+  cache.misses++;
+  std::string output;
+  {
+    py::gil_scoped_release release;
+    output = translate();
+  }
+  // Other threads may have used the cache meanwhile, key & text are only
+  // updated together with the GIL held.
+  cache.valid = true;
+  cache.key = key;
+  cache.output = std::move(output);
+  cache.text = py::object();
+  return cache.output;
+}
+
+template <typename Key, typename F>
+py::object NLELanguageObsv::cached_text(FieldCache<Key> &cache, const Key &key,
+                                        F translate) {
+  const std::string &output = cached_output(cache, key, translate);
+  if (!cache.text) cache.text = text_object(output);
+  return cache.text;
+}
+
+py::dict NLELanguageObsv::cache_info() {
+  py::dict info;
+  info["text_inventory"] = py::dict(py::arg("hits") = inventory_cache.hits,
+                                    py::arg("misses") = inventory_cache.misses);
+  info["text_cursor"] = py::dict(py::arg("hits") = cursor_cache.hits,
+                                 py::arg("misses") = cursor_cache.misses);
+  if (glyphs_content_cache.enabled()) {
+    info["text_glyphs"] = glyphs_content_cache.info();
+    info["text_message"] = message_content_cache.info();
+    info["text_blstats"] = blstats_content_cache.info();
+  }
+  return info;
+}
+
+std::string NLELanguageObsv::inventory_to_text(uint8_t *inv_strs_data,
+                                               uint8_t *inv_letters_data,
+                                               size_t x, size_t y) const {
   std::string output = "";
 
   for (uint64_t i = 0; i < x; i++) {
@@ -951,10 +1800,11 @@ py::bytes NLELanguageObsv::text_inventory(py::array_t<uint8_t> inv_strs,
     } else
       break;
   }
-  return py::bytes(output);
+  return output;
 }
 
-std::pair<std::string, std::string> NLELanguageObsv::pos_to_str(int x, int y) {
+std::pair<std::string, std::string> NLELanguageObsv::pos_to_str(int x,
+                                                                int y) const {
   int diag_dist = diagonal_distance(x, y);
   std::string diagonal = "";
   if (diag_dist > 0) {
@@ -1003,7 +1853,7 @@ std::pair<std::string, std::string> NLELanguageObsv::pos_to_str(int x, int y) {
   return std::pair{distance_str, direction_str};
 }
 
-std::string NLELanguageObsv::offset_to_str(int offset) {
+std::string NLELanguageObsv::offset_to_str(int offset) const {
   if (offset == 1)
     return "adjacent";
   else if (offset == 2)
@@ -1016,151 +1866,698 @@ std::string NLELanguageObsv::offset_to_str(int offset) {
     return "very far";
 }
 
-int NLELanguageObsv::diagonal_distance(int dx, int dy) {
+int NLELanguageObsv::diagonal_distance(int dx, int dy) const {
   dx = abs(dx);
   dy = abs(dy);
   int diagonal_steps = min(dx, dy);
   return diagonal_steps;
 }
 
-py::bytes NLELanguageObsv::text_blstats(py::array_t<int64_t> blstats) {
+py::object NLELanguageObsv::text_blstats(py::array_t<int64_t> blstats) {
   py::buffer_info blstats_buffer = blstats.request();
   int64_t *blstats_data = reinterpret_cast<int64_t *>(blstats_buffer.ptr);
 
-  std::string alignment_str = alignment_map[blstats_data[26]];
-  std::string hunger_str = hunger_map[blstats_data[21]];
-  std::string encumbrance_str = encumbrance_map[blstats_data[22]];
+  std::string output;
+  {
+    py::gil_scoped_release release;
+    output = cached_blstats_to_text(blstats_data, blstats.size());
+  }
+  return text_object(output);
+}
 
-  std::unordered_map<int64_t, std::string> condition_map = {
-      {BL_MASK_STONE, "Stoned"},
-      {BL_MASK_SLIME, "Slimed"},
-      {BL_MASK_STRNGL, "Strangled"},
-      {BL_MASK_FOODPOIS, "Food Poisoning"},
-      {BL_MASK_TERMILL, "Terminally Ill"},
-      {BL_MASK_BLIND, "Blind"},
-      {BL_MASK_DEAF, "Deaf"},
-      {BL_MASK_STUN, "Stunned"},
-      {BL_MASK_CONF, "Confused"},
-      {BL_MASK_HALLU, "Hallucinating"},
-      {BL_MASK_LEV, "Levitating"},
-      {BL_MASK_FLY, "Flying"},
-      {BL_MASK_RIDE, "Riding"},
-  };
+// Appends the decimal representation of value without going through iostreams.
+static void append_int(std::string &output, int64_t value) {
+  char digits[24];
+  char *end = std::to_chars(digits, digits + sizeof(digits), value).ptr;
+  output.append(digits, end);
+}
 
-  std::vector<std::string> conditions;
+std::string NLELanguageObsv::blstats_to_text(int64_t *blstats_data) const {
+  // Stats often do not change between steps, e.g. while searching.
+  thread_local bool cached = false;
+  thread_local std::array<int64_t, BLSTATS_SIZE> cached_blstats;
+  thread_local std::string output;
+  if (cached &&
+      std::equal(cached_blstats.begin(), cached_blstats.end(), blstats_data)) {
+    return output;
+  }
+  std::copy(blstats_data, blstats_data + BLSTATS_SIZE, cached_blstats.begin());
+  cached = true;
+
+  output.clear();
+  output += "Strength: ";
+  append_int(output, blstats_data[3]);
+  output += "/";
+  append_int(output, blstats_data[2]);
+  output += "\nDexterity: ";
+  append_int(output, blstats_data[4]);
+  output += "\nConstitution: ";
+  append_int(output, blstats_data[5]);
+  output += "\nIntelligence: ";
+  append_int(output, blstats_data[6]);
+  output += "\nWisdom: ";
+  append_int(output, blstats_data[7]);
+  output += "\nCharisma: ";
+  append_int(output, blstats_data[8]);
+  output += "\nDepth: ";
+  append_int(output, blstats_data[12]);
+  output += "\nGold: ";
+  append_int(output, blstats_data[13]);
+  output += "\nHP: ";
+  append_int(output, blstats_data[10]);
+  output += "/";
+  append_int(output, blstats_data[11]);
+  output += "\nEnergy: ";
+  append_int(output, blstats_data[14]);
+  output += "/";
+  append_int(output, blstats_data[15]);
+  output += "\nAC: ";
+  append_int(output, blstats_data[16]);
+  output += "\nXP: ";
+  append_int(output, blstats_data[18]);
+  output += "/";
+  append_int(output, blstats_data[19]);
+  output += "\nTime: ";
+  append_int(output, blstats_data[20]);
+  output += "\nPosition: ";
+  append_int(output, blstats_data[0]);
+  output += "|";
+  append_int(output, blstats_data[1]);
+  output += "\nHunger: ";
+  output += find_or_empty(hunger_map, blstats_data[21]);
+  output += "\nMonster Level: ";
+  append_int(output, blstats_data[17]);
+  output += "\nEncumbrance: ";
+  output += find_or_empty(encumbrance_map, blstats_data[22]);
+  output += "\nDungeon Number: ";
+  append_int(output, blstats_data[23]);
+  output += "\nLevel Number: ";
+  append_int(output, blstats_data[24]);
+  output += "\nScore: ";
+  append_int(output, blstats_data[9]);
+  output += "\nAlignment: ";
+  output += find_or_empty(alignment_map, blstats_data[26]);
+  output += "\nCondition: ";
+
+  bool any_condition = false;
   for (const auto &[mask, condition] : condition_map) {
     if (blstats_data[25] & mask) {
-      conditions.push_back(condition);
-    }
-  }
-
-  std::string condition;
-  if (conditions.empty()) {
-    condition = "None";
-  } else if (conditions.size() == 1) {
-    condition = conditions[0];
-  } else {
-    condition = conditions[0];
-    for (auto it = ++conditions.begin(); it != conditions.end(); ++it) {
-      condition += " " + *it;
+      if (any_condition) output += " ";
+      output += condition;
+      any_condition = true;
     }
   }
-
-  std::stringstream ss;
-  ss << "Strength: " << blstats_data[3] << "/" << blstats_data[2] << "\n"
-     << "Dexterity: " << blstats_data[4] << "\n"
-     << "Constitution: " << blstats_data[5] << "\n"
-     << "Intelligence: " << blstats_data[6] << "\n"
-     << "Wisdom: " << blstats_data[7] << "\n"
-     << "Charisma: " << blstats_data[8] << "\n"
-     << "Depth: " << blstats_data[12] << "\n"
-     << "Gold: " << blstats_data[13] << "\n"
-     << "HP: " << blstats_data[10] << "/" << blstats_data[11] << "\n"
-     << "Energy: " << blstats_data[14] << "/" << blstats_data[15] << "\n"
-     << "AC: " << blstats_data[16] << "\n"
-     << "XP: " << blstats_data[18] << "/" << blstats_data[19] << "\n"
-     << "Time: " << blstats_data[20] << "\n"
-     << "Position: " << blstats_data[0] << "|" << blstats_data[1] << "\n"
-     << "Hunger: " << hunger_str << "\n"
-     << "Monster Level: " << blstats_data[17] << "\n"
-     << "Encumbrance: " << encumbrance_str << "\n"
-     << "Dungeon Number: " << blstats_data[23] << "\n"
-     << "Level Number: " << blstats_data[24] << "\n"
-     << "Score: " << blstats_data[9] << "\n"
-     << "Alignment: " << alignment_str << "\n"
-     << "Condition: " << condition;
-
-  return py::bytes(ss.str());
-}
-
-std::string NLELanguageObsv::trim(std::string input) {
-  const std::string WHITESPACE = " \32\0\n\r\t\f\v";
-  size_t start = input.find_first_not_of(WHITESPACE);
-  if (start == (input.size() - 1)) return "";
-  std::string output = input.erase(0, start);
-  size_t end = output.find_last_not_of(WHITESPACE, output.size() - 1);
-  output = output.erase(end + 1, std::string::npos);
+  if (!any_condition) output += "None";
   return output;
 }
 
-py::bytes NLELanguageObsv::text_message(py::array_t<uint8_t> tty_chars) {
+std::string_view NLELanguageObsv::trim(std::string_view input) const {
+  // Only space & substitute, the NUL in the set ends the string literal.
+  auto is_whitespace = [](char c) { return c == ' ' || c == '\32'; };
+  size_t start = 0;
+  while (start < input.size() && is_whitespace(input[start])) start++;
+  // A lone character in the last column is trimmed as well.
+  if (start + 1 >= input.size()) return std::string_view();
+  size_t end = input.size();
+  while (is_whitespace(input[end - 1])) end--;
+  return input.substr(start, end - start);
+}
+
+py::object NLELanguageObsv::text_message(py::array_t<uint8_t> tty_chars) {
   py::buffer_info tty_chars_buffer = tty_chars.request();
   uint8_t *tty_chars_data = reinterpret_cast<uint8_t *>(tty_chars_buffer.ptr);
 
   size_t rows = tty_chars_buffer.shape[0];
   size_t columns = tty_chars_buffer.shape[1];
-  std::string output = "";
-  bool multipage_message = false;
-
-  std::string first_row_str(reinterpret_cast<char *>(&(tty_chars_data[0])),
-                            columns);
-  std::string second_row_str(
-      reinterpret_cast<char *>(&(tty_chars_data[1 * columns])), columns);
-  size_t indent = first_row_str.find_first_not_of(' ');
-  first_row_str = trim(first_row_str);
-  second_row_str = trim(second_row_str);
-
-  if (first_row_str == "" && second_row_str == "")
-    return py::bytes(first_row_str);
+
+  std::string output;
+  {
+    py::gil_scoped_release release;
+    output = cached_message_to_text(tty_chars_data, rows, columns);
+  }
+  return text_object(output);
+}
+
+std::string NLELanguageObsv::message_to_text(uint8_t *tty_chars_data,
+                                             size_t rows,
+                                             size_t columns) const {
+  const char *tty_chars = reinterpret_cast<const char *>(tty_chars_data);
+  std::string_view first_row(tty_chars, columns);
+  size_t indent = first_row.find_first_not_of(' ');
+  if (indent == std::string_view::npos) indent = 0;
+  first_row = trim(first_row);
+  std::string_view second_row =
+      trim(std::string_view(tty_chars + columns, columns));
+
+  if (first_row.empty() && second_row.empty()) return std::string();
   // If we see the points header or the top ten list message!
-  bool death_screen = (second_row_str.find("Points") != std::string::npos |
-                       second_row_str.find("list!") != std::string::npos);
+  bool death_screen = (second_row.find("Points") != std::string_view::npos ||
+                       second_row.find("list!") != std::string_view::npos);
   uint64_t blank_row_count = 0;
+  std::string output;
 
   for (uint64_t row_idx = 0; row_idx < rows; row_idx++) {
-    std::string row_str(reinterpret_cast<char *>(
-                            &(tty_chars_data[indent + (row_idx * columns)])),
-                        columns - indent);
-    row_str = trim(row_str);
-    if (row_str == "")
+    std::string_view row = trim(std::string_view(
+        tty_chars + indent + row_idx * columns, columns - indent));
+    if (row.empty())
       blank_row_count++;
     else
       blank_row_count = 0;
 
-    size_t of_pos = row_str.find(" of ");
-    multipage_message =
-        // End of multiline page ending in something like (1 of 5)
-        (((of_pos != std::string::npos) && (row_str[of_pos - 2] == '(') &&
-          (row_str[of_pos + 5] == ')')) ||
-         // End of multiline page ending in --More--
-         (row_str.find("--More--") != std::string::npos) ||
-         // End of multiline page ending in (end)
-         (row_str.find("(end)") != std::string::npos));
-    if (row_str != "") output += row_str;
-    if (multipage_message) return py::bytes(output);
-    if (row_str != "") output += "\n";
+    // A multiline page ends in --More--, (end) or something like (1 of 5).
+    bool multipage_message = false;
+    size_t of_pos = std::string_view::npos;
+    for (size_t i = 0; i < row.size() && !multipage_message; i++) {
+      if (row[i] == '-')
+        multipage_message = row.substr(i, 8) == "--More--";
+      else if (row[i] == '(')
+        multipage_message = row.substr(i, 5) == "(end)";
+      else if (row[i] == ' ' && of_pos == std::string_view::npos &&
+               row.substr(i, 4) == " of ")
+        of_pos = i;
+    }
+    if (of_pos != std::string_view::npos && of_pos >= 2 &&
+        of_pos + 5 < row.size() && row[of_pos - 2] == '(' &&
+        row[of_pos + 5] == ')')
+      multipage_message = true;
+
+    output += row;
+    if (multipage_message) return output;
+    if (!row.empty()) output += "\n";
     // Death screen does not have an end marker so we have to count blank lines
-    if (death_screen && blank_row_count > 1) return py::bytes(output);
+    if (death_screen && blank_row_count > 1) return output;
+  }
+  return std::string(first_row);
+}
+
+py::tuple NLELanguageObsv::text_all(py::array_t<int16_t> glyphs,
+                                    py::array_t<int64_t> blstats,
+                                    py::array_t<int64_t> tty_cursor,
+                                    py::array_t<uint8_t> inv_strs,
+                                    py::array_t<uint8_t> inv_letters,
+                                    py::array_t<uint8_t> tty_chars) {
+  py::buffer_info glyphs_buffer = glyphs.request();
+  py::buffer_info blstats_buffer = blstats.request();
+  py::buffer_info tty_cursor_buffer = tty_cursor.request();
+  py::buffer_info inv_strs_buffer = inv_strs.request();
+  py::buffer_info inv_letters_buffer = inv_letters.request();
+  py::buffer_info tty_chars_buffer = tty_chars.request();
+
+  int16_t *glyphs_data = reinterpret_cast<int16_t *>(glyphs_buffer.ptr);
+  int64_t *blstats_data = reinterpret_cast<int64_t *>(blstats_buffer.ptr);
+  int64_t *tty_cursor_data = reinterpret_cast<int64_t *>(tty_cursor_buffer.ptr);
+  uint8_t *inv_strs_data = reinterpret_cast<uint8_t *>(inv_strs_buffer.ptr);
+  uint8_t *inv_letters_data =
+      reinterpret_cast<uint8_t *>(inv_letters_buffer.ptr);
+  uint8_t *tty_chars_data = reinterpret_cast<uint8_t *>(tty_chars_buffer.ptr);
+
+  size_t glyphs_size = glyphs.size();
+  size_t inv_rows = inv_strs_buffer.shape[0];
+  size_t inv_columns = inv_strs_buffer.shape[1];
+  size_t tty_rows = tty_chars_buffer.shape[0];
+  size_t tty_columns = tty_chars_buffer.shape[1];
+
+  std::array<std::string, 3> texts;
+  InventoryKey inventory_cache_key;
+  CursorKey cursor_cache_key;
+  {
+    py::gil_scoped_release release;
+    texts[0] = cached_glyphs_to_text(glyphs_data, glyphs_size, blstats_data);
+    texts[1] = cached_message_to_text(tty_chars_data, tty_rows, tty_columns);
+    texts[2] = cached_blstats_to_text(blstats_data, blstats.size());
+    inventory_cache_key =
+        inventory_key(inv_strs_data, inv_letters_data, inv_rows, inv_columns);
+    cursor_cache_key =
+        cursor_key(glyphs_data, glyphs_size, blstats_data, tty_cursor_data);
+  }
+  py::object text_inventory =
+      cached_text(inventory_cache, inventory_cache_key, [&] {
+        return inventory_to_text(inv_strs_data, inv_letters_data, inv_rows,
+                                 inv_columns);
+      });
+  py::object text_cursor = cached_text(cursor_cache, cursor_cache_key, [&] {
+    return cursor_to_text(glyphs_data, glyphs_size, blstats_data,
+                          tty_cursor_data);
+  });
+  // Same order as the observation keys of the python wrapper.
+  return py::make_tuple(text_object(texts[0]), text_object(texts[1]),
+                        text_object(texts[2]), text_inventory, text_cursor);
+}
+
+// Copy a text into a row of an output buffer, the text is truncated to the row
+// and the rest of the row is left as is. Returns the untruncated length.
+static int64_t write_text(const std::string &text, uint8_t *row,
+                          size_t row_size) {
+  size_t size = text.size() < row_size ? text.size() : row_size;
+  std::memcpy(row, text.data(), size);
+  return text.size();
+}
+
+void NLELanguageObsv::text_all_into(
+    py::array_t<int16_t> glyphs, py::array_t<int64_t> blstats,
+    py::array_t<int64_t> tty_cursor, py::array_t<uint8_t> inv_strs,
+    py::array_t<uint8_t> inv_letters, py::array_t<uint8_t> tty_chars,
+    py::array_t<uint8_t, py::array::c_style> out,
+    py::array_t<int64_t, py::array::c_style> lengths) {
+  py::buffer_info out_buffer = out.request(true);
+  py::buffer_info lengths_buffer = lengths.request(true);
+  if (out_buffer.ndim != 2 || out_buffer.shape[0] != 5)
+    throw std::invalid_argument("out must have shape (5, L)");
+  if (lengths_buffer.size != 5)
+    throw std::invalid_argument("lengths must have size 5");
+
+  py::buffer_info glyphs_buffer = glyphs.request();
+  py::buffer_info blstats_buffer = blstats.request();
+  py::buffer_info tty_cursor_buffer = tty_cursor.request();
+  py::buffer_info inv_strs_buffer = inv_strs.request();
+  py::buffer_info inv_letters_buffer = inv_letters.request();
+  py::buffer_info tty_chars_buffer = tty_chars.request();
+
+  int16_t *glyphs_data = reinterpret_cast<int16_t *>(glyphs_buffer.ptr);
+  int64_t *blstats_data = reinterpret_cast<int64_t *>(blstats_buffer.ptr);
+  int64_t *tty_cursor_data = reinterpret_cast<int64_t *>(tty_cursor_buffer.ptr);
+  uint8_t *inv_strs_data = reinterpret_cast<uint8_t *>(inv_strs_buffer.ptr);
+  uint8_t *inv_letters_data =
+      reinterpret_cast<uint8_t *>(inv_letters_buffer.ptr);
+  uint8_t *tty_chars_data = reinterpret_cast<uint8_t *>(tty_chars_buffer.ptr);
+  uint8_t *out_data = reinterpret_cast<uint8_t *>(out_buffer.ptr);
+  int64_t *lengths_data = reinterpret_cast<int64_t *>(lengths_buffer.ptr);
+
+  size_t glyphs_size = glyphs.size();
+  size_t inv_rows = inv_strs_buffer.shape[0];
+  size_t inv_columns = inv_strs_buffer.shape[1];
+  size_t tty_rows = tty_chars_buffer.shape[0];
+  size_t tty_columns = tty_chars_buffer.shape[1];
+  size_t row_size = out_buffer.shape[1];
+
+  InventoryKey inventory_cache_key;
+  CursorKey cursor_cache_key;
+  {
+    py::gil_scoped_release release;
+    lengths_data[0] = write_text(
+        cached_glyphs_to_text(glyphs_data, glyphs_size, blstats_data), out_data,
+        row_size);
+    lengths_data[1] = write_text(
+        cached_message_to_text(tty_chars_data, tty_rows, tty_columns),
+        out_data + row_size, row_size);
+    lengths_data[2] =
+        write_text(cached_blstats_to_text(blstats_data, blstats.size()),
+                   out_data + 2 * row_size, row_size);
+    inventory_cache_key =
+        inventory_key(inv_strs_data, inv_letters_data, inv_rows, inv_columns);
+    cursor_cache_key =
+        cursor_key(glyphs_data, glyphs_size, blstats_data, tty_cursor_data);
+  }
+  // The cached texts are copied from C++, no python object is created.
+  lengths_data[3] = write_text(
+      cached_output(inventory_cache, inventory_cache_key,
+                    [&] {
+                      return inventory_to_text(inv_strs_data, inv_letters_data,
+                                               inv_rows, inv_columns);
+                    }),
+      out_data + 3 * row_size, row_size);
+  lengths_data[4] = write_text(
+      cached_output(cursor_cache, cursor_cache_key,
+                    [&] {
+                      return cursor_to_text(glyphs_data, glyphs_size,
+                                            blstats_data, tty_cursor_data);
+                    }),
+      out_data + 4 * row_size, row_size);
+}
+
+size_t batch_size(const py::buffer_info &buffer, py::ssize_t ndim,
+                  const std::string &name) {
+  if (buffer.ndim != ndim)
+    throw std::invalid_argument(name + " must have " + std::to_string(ndim) +
+                                " dimensions, got " +
+                                std::to_string(buffer.ndim));
+  return buffer.shape[0];
+}
+
+void check_batch_size(size_t expected, size_t actual, const std::string &name) {
+  if (expected != actual)
+    throw std::invalid_argument(name + " has batch size " +
+                                std::to_string(actual) + ", expected " +
+                                std::to_string(expected));
+}
+
+void check_glyphs_shape(const py::buffer_info &buffer) {
+  if (buffer.shape[1] != DUNGEON_HEIGHT || buffer.shape[2] != DUNGEON_WIDTH)
+    throw std::invalid_argument("glyphs must have shape (N, " +
+                                std::to_string(DUNGEON_HEIGHT) + ", " +
+                                std::to_string(DUNGEON_WIDTH) + ")");
+}
+
+void check_blstats_shape(const py::buffer_info &buffer) {
+  if (buffer.shape[1] < static_cast<py::ssize_t>(BLSTATS_SIZE))
+    throw std::invalid_argument("blstats must have shape (N, " +
+                                std::to_string(BLSTATS_SIZE) + "), got " +
+                                std::to_string(buffer.shape[1]) + " columns");
+}
+
+void check_tty_cursor_shape(const py::buffer_info &buffer) {
+  if (buffer.shape[1] < 2)
+    throw std::invalid_argument("tty_cursor must have shape (N, 2), got " +
+                                std::to_string(buffer.shape[1]) + " columns");
+}
+
+void check_inv_letters_shape(const py::buffer_info &inv_letters_buffer,
+                             const py::buffer_info &inv_strs_buffer) {
+  if (inv_letters_buffer.shape[1] < inv_strs_buffer.shape[1])
+    throw std::invalid_argument(
+        "inv_letters has " + std::to_string(inv_letters_buffer.shape[1]) +
+        " letters, expected at least one per inv_strs row (" +
+        std::to_string(inv_strs_buffer.shape[1]) + ")");
+}
+
+template <typename F>
+void NLELanguageObsv::run_batch(size_t batch_size, int num_threads,
+                                F translate) {
+  // Only plain C++ data is touched from here on so the GIL can be released.
+  py::gil_scoped_release release;
+  // NetHack's hack.h defines min and max macros, so std::min/max are avoided.
+  size_t thread_count = num_threads;
+  if (num_threads <= 0) thread_count = std::thread::hardware_concurrency();
+  if (thread_count > batch_size) thread_count = batch_size;
+  if (thread_count <= 1) {
+    for (size_t i = 0; i < batch_size; i++) translate(i);
+    return;
   }
-  return py::bytes(first_row_str);
+  // Threads are started per call rather than kept in a persistent pool as
+  // sample factory forks its workers after the translator is created.
+  std::atomic<size_t> next_idx{0};
+  auto worker = [&]() {
+    for (size_t i = next_idx++; i < batch_size; i = next_idx++) translate(i);
+  };
+  std::vector<std::thread> threads;
+  for (size_t i = 1; i < thread_count; i++) threads.emplace_back(worker);
+  worker();
+  for (auto &thread : threads) thread.join();
+}
+
+py::object NLELanguageObsv::text_object(const std::string &text) const {
+  if (!as_str) return py::bytes(text);
+  PyObject *decoded = PyUnicode_DecodeLatin1(text.data(), text.size(), nullptr);
+  if (!decoded) throw py::error_already_set();
+  return py::reinterpret_steal<py::object>(decoded);
+}
+
+py::list NLELanguageObsv::text_objects(
+    const std::vector<std::string> &texts) const {
+  py::list output;
+  for (const auto &text : texts) output.append(text_object(text));
+  return output;
+}
+
+py::list NLELanguageObsv::text_glyphs_batch(batch_array<int16_t> glyphs,
+                                            batch_array<int64_t> blstats,
+                                            int num_threads,
+                                            std::optional<size_t> max_lines,
+                                            std::optional<size_t> max_chars) {
+  py::buffer_info glyphs_buffer = glyphs.request();
+  py::buffer_info blstats_buffer = blstats.request();
+  size_t n = batch_size(glyphs_buffer, 3, "glyphs");
+  check_glyphs_shape(glyphs_buffer);
+  check_batch_size(n, batch_size(blstats_buffer, 2, "blstats"), "blstats");
+  check_blstats_shape(blstats_buffer);
+
+  int16_t *glyphs_data = reinterpret_cast<int16_t *>(glyphs_buffer.ptr);
+  int64_t *blstats_data = reinterpret_cast<int64_t *>(blstats_buffer.ptr);
+  size_t blstats_stride = blstats_buffer.shape[1];
+
+  GlyphBudget budget = glyph_budget(max_lines, max_chars);
+  std::vector<std::string> outputs(n);
+  run_batch(n, num_threads, [&](size_t i) {
+    outputs[i] =
+        glyphs_to_text(glyphs_data + i * DUNGEON_WIDTH * DUNGEON_HEIGHT,
+                       blstats_data + i * blstats_stride, budget);
+  });
+  return text_objects(outputs);
+}
+
+py::list NLELanguageObsv::text_blstats_batch(batch_array<int64_t> blstats,
+                                             int num_threads) {
+  py::buffer_info blstats_buffer = blstats.request();
+  size_t n = batch_size(blstats_buffer, 2, "blstats");
+  check_blstats_shape(blstats_buffer);
+
+  int64_t *blstats_data = reinterpret_cast<int64_t *>(blstats_buffer.ptr);
+  size_t blstats_stride = blstats_buffer.shape[1];
+
+  std::vector<std::string> outputs(n);
+  run_batch(n, num_threads, [&](size_t i) {
+    outputs[i] = blstats_to_text(blstats_data + i * blstats_stride);
+  });
+  return text_objects(outputs);
+}
+
+py::list NLELanguageObsv::text_inventory_batch(batch_array<uint8_t> inv_strs,
+                                               batch_array<uint8_t> inv_letters,
+                                               int num_threads) {
+  py::buffer_info inv_strs_buffer = inv_strs.request();
+  py::buffer_info inv_letters_buffer = inv_letters.request();
+  size_t n = batch_size(inv_strs_buffer, 3, "inv_strs");
+  check_batch_size(n, batch_size(inv_letters_buffer, 2, "inv_letters"),
+                   "inv_letters");
+  check_inv_letters_shape(inv_letters_buffer, inv_strs_buffer);
+
+  uint8_t *inv_strs_data = reinterpret_cast<uint8_t *>(inv_strs_buffer.ptr);
+  uint8_t *inv_letters_data =
+      reinterpret_cast<uint8_t *>(inv_letters_buffer.ptr);
+  size_t rows = inv_strs_buffer.shape[1];
+  size_t columns = inv_strs_buffer.shape[2];
+  size_t inv_letters_stride = inv_letters_buffer.shape[1];
+
+  std::vector<std::string> outputs(n);
+  run_batch(n, num_threads, [&](size_t i) {
+    outputs[i] = inventory_to_text(inv_strs_data + i * rows * columns,
+                                   inv_letters_data + i * inv_letters_stride,
+                                   rows, columns);
+  });
+  return text_objects(outputs);
+}
+
+py::list NLELanguageObsv::text_cursor_batch(batch_array<int16_t> glyphs,
+                                            batch_array<int64_t> blstats,
+                                            batch_array<int64_t> tty_cursor,
+                                            int num_threads) {
+  py::buffer_info glyphs_buffer = glyphs.request();
+  py::buffer_info blstats_buffer = blstats.request();
+  py::buffer_info tty_cursor_buffer = tty_cursor.request();
+  size_t n = batch_size(glyphs_buffer, 3, "glyphs");
+  check_glyphs_shape(glyphs_buffer);
+  check_batch_size(n, batch_size(blstats_buffer, 2, "blstats"), "blstats");
+  check_blstats_shape(blstats_buffer);
+  check_batch_size(n, batch_size(tty_cursor_buffer, 2, "tty_cursor"),
+                   "tty_cursor");
+  check_tty_cursor_shape(tty_cursor_buffer);
+
+  int16_t *glyphs_data = reinterpret_cast<int16_t *>(glyphs_buffer.ptr);
+  int64_t *blstats_data = reinterpret_cast<int64_t *>(blstats_buffer.ptr);
+  int64_t *tty_cursor_data = reinterpret_cast<int64_t *>(tty_cursor_buffer.ptr);
+  size_t glyphs_size = DUNGEON_WIDTH * DUNGEON_HEIGHT;
+  size_t blstats_stride = blstats_buffer.shape[1];
+  size_t tty_cursor_stride = tty_cursor_buffer.shape[1];
+
+  std::vector<std::string> outputs(n);
+  run_batch(n, num_threads, [&](size_t i) {
+    outputs[i] = cursor_to_text(glyphs_data + i * glyphs_size, glyphs_size,
+                                blstats_data + i * blstats_stride,
+                                tty_cursor_data + i * tty_cursor_stride);
+  });
+  return text_objects(outputs);
+}
+
+py::list NLELanguageObsv::text_message_batch(batch_array<uint8_t> tty_chars,
+                                             int num_threads) {
+  py::buffer_info tty_chars_buffer = tty_chars.request();
+  size_t n = batch_size(tty_chars_buffer, 3, "tty_chars");
+
+  uint8_t *tty_chars_data = reinterpret_cast<uint8_t *>(tty_chars_buffer.ptr);
+  size_t rows = tty_chars_buffer.shape[1];
+  size_t columns = tty_chars_buffer.shape[2];
+
+  std::vector<std::string> outputs(n);
+  run_batch(n, num_threads, [&](size_t i) {
+    outputs[i] =
+        message_to_text(tty_chars_data + i * rows * columns, rows, columns);
+  });
+  return text_objects(outputs);
+}
+
+py::list NLELanguageObsv::text_all_batch(batch_array<int16_t> glyphs,
+                                         batch_array<int64_t> blstats,
+                                         batch_array<int64_t> tty_cursor,
+                                         batch_array<uint8_t> inv_strs,
+                                         batch_array<uint8_t> inv_letters,
+                                         batch_array<uint8_t> tty_chars,
+                                         int num_threads) {
+  py::buffer_info glyphs_buffer = glyphs.request();
+  py::buffer_info blstats_buffer = blstats.request();
+  py::buffer_info tty_cursor_buffer = tty_cursor.request();
+  py::buffer_info inv_strs_buffer = inv_strs.request();
+  py::buffer_info inv_letters_buffer = inv_letters.request();
+  py::buffer_info tty_chars_buffer = tty_chars.request();
+  size_t n = batch_size(glyphs_buffer, 3, "glyphs");
+  check_glyphs_shape(glyphs_buffer);
+  check_batch_size(n, batch_size(blstats_buffer, 2, "blstats"), "blstats");
+  check_blstats_shape(blstats_buffer);
+  check_batch_size(n, batch_size(tty_cursor_buffer, 2, "tty_cursor"),
+                   "tty_cursor");
+  check_tty_cursor_shape(tty_cursor_buffer);
+  check_batch_size(n, batch_size(inv_strs_buffer, 3, "inv_strs"), "inv_strs");
+  check_batch_size(n, batch_size(inv_letters_buffer, 2, "inv_letters"),
+                   "inv_letters");
+  check_inv_letters_shape(inv_letters_buffer, inv_strs_buffer);
+  check_batch_size(n, batch_size(tty_chars_buffer, 3, "tty_chars"),
+                   "tty_chars");
+
+  int16_t *glyphs_data = reinterpret_cast<int16_t *>(glyphs_buffer.ptr);
+  int64_t *blstats_data = reinterpret_cast<int64_t *>(blstats_buffer.ptr);
+  int64_t *tty_cursor_data = reinterpret_cast<int64_t *>(tty_cursor_buffer.ptr);
+  uint8_t *inv_strs_data = reinterpret_cast<uint8_t *>(inv_strs_buffer.ptr);
+  uint8_t *inv_letters_data =
+      reinterpret_cast<uint8_t *>(inv_letters_buffer.ptr);
+  uint8_t *tty_chars_data = reinterpret_cast<uint8_t *>(tty_chars_buffer.ptr);
+  size_t glyphs_size = DUNGEON_WIDTH * DUNGEON_HEIGHT;
+  size_t blstats_stride = blstats_buffer.shape[1];
+  size_t tty_cursor_stride = tty_cursor_buffer.shape[1];
+  size_t inv_rows = inv_strs_buffer.shape[1];
+  size_t inv_columns = inv_strs_buffer.shape[2];
+  size_t inv_letters_stride = inv_letters_buffer.shape[1];
+  size_t tty_rows = tty_chars_buffer.shape[1];
+  size_t tty_columns = tty_chars_buffer.shape[2];
+
+  std::vector<std::array<std::string, 5>> outputs(n);
+  run_batch(n, num_threads, [&](size_t i) {
+    int16_t *env_glyphs = glyphs_data + i * glyphs_size;
+    int64_t *env_blstats = blstats_data + i * blstats_stride;
+    outputs[i][0] = glyphs_to_text(env_glyphs, env_blstats);
+    outputs[i][1] = message_to_text(tty_chars_data + i * tty_rows * tty_columns,
+                                    tty_rows, tty_columns);
+    outputs[i][2] = blstats_to_text(env_blstats);
+    outputs[i][3] = inventory_to_text(
+        inv_strs_data + i * inv_rows * inv_columns,
+        inv_letters_data + i * inv_letters_stride, inv_rows, inv_columns);
+    outputs[i][4] = cursor_to_text(env_glyphs, glyphs_size, env_blstats,
+                                   tty_cursor_data + i * tty_cursor_stride);
+  });
+
+  py::list output;
+  for (const auto &texts : outputs)
+    output.append(py::make_tuple(text_object(texts[0]), text_object(texts[1]),
+                                 text_object(texts[2]), text_object(texts[3]),
+                                 text_object(texts[4])));
+  return output;
+}
+
+void NLELanguageObsv::text_all_batch_into(
+    batch_array<int16_t> glyphs, batch_array<int64_t> blstats,
+    batch_array<int64_t> tty_cursor, batch_array<uint8_t> inv_strs,
+    batch_array<uint8_t> inv_letters, batch_array<uint8_t> tty_chars,
+    py::array_t<uint8_t, py::array::c_style> out,
+    py::array_t<int64_t, py::array::c_style> lengths, int num_threads) {
+  py::buffer_info glyphs_buffer = glyphs.request();
+  py::buffer_info blstats_buffer = blstats.request();
+  py::buffer_info tty_cursor_buffer = tty_cursor.request();
+  py::buffer_info inv_strs_buffer = inv_strs.request();
+  py::buffer_info inv_letters_buffer = inv_letters.request();
+  py::buffer_info tty_chars_buffer = tty_chars.request();
+  py::buffer_info out_buffer = out.request(true);
+  py::buffer_info lengths_buffer = lengths.request(true);
+  size_t n = batch_size(glyphs_buffer, 3, "glyphs");
+  check_glyphs_shape(glyphs_buffer);
+  check_batch_size(n, batch_size(blstats_buffer, 2, "blstats"), "blstats");
+  check_blstats_shape(blstats_buffer);
+  check_batch_size(n, batch_size(tty_cursor_buffer, 2, "tty_cursor"),
+                   "tty_cursor");
+  check_tty_cursor_shape(tty_cursor_buffer);
+  check_batch_size(n, batch_size(inv_strs_buffer, 3, "inv_strs"), "inv_strs");
+  check_batch_size(n, batch_size(inv_letters_buffer, 2, "inv_letters"),
+                   "inv_letters");
+  check_inv_letters_shape(inv_letters_buffer, inv_strs_buffer);
+  check_batch_size(n, batch_size(tty_chars_buffer, 3, "tty_chars"),
+                   "tty_chars");
+  check_batch_size(n, batch_size(out_buffer, 3, "out"), "out");
+  check_batch_size(n, batch_size(lengths_buffer, 2, "lengths"), "lengths");
+  if (out_buffer.shape[1] != 5)
+    throw std::invalid_argument("out must have shape (N, 5, L)");
+  if (lengths_buffer.shape[1] != 5)
+    throw std::invalid_argument("lengths must have shape (N, 5)");
+
+  int16_t *glyphs_data = reinterpret_cast<int16_t *>(glyphs_buffer.ptr);
+  int64_t *blstats_data = reinterpret_cast<int64_t *>(blstats_buffer.ptr);
+  int64_t *tty_cursor_data = reinterpret_cast<int64_t *>(tty_cursor_buffer.ptr);
+  uint8_t *inv_strs_data = reinterpret_cast<uint8_t *>(inv_strs_buffer.ptr);
+  uint8_t *inv_letters_data =
+      reinterpret_cast<uint8_t *>(inv_letters_buffer.ptr);
+  uint8_t *tty_chars_data = reinterpret_cast<uint8_t *>(tty_chars_buffer.ptr);
+  uint8_t *out_data = reinterpret_cast<uint8_t *>(out_buffer.ptr);
+  int64_t *lengths_data = reinterpret_cast<int64_t *>(lengths_buffer.ptr);
+  size_t glyphs_size = DUNGEON_WIDTH * DUNGEON_HEIGHT;
+  size_t blstats_stride = blstats_buffer.shape[1];
+  size_t tty_cursor_stride = tty_cursor_buffer.shape[1];
+  size_t inv_rows = inv_strs_buffer.shape[1];
+  size_t inv_columns = inv_strs_buffer.shape[2];
+  size_t inv_letters_stride = inv_letters_buffer.shape[1];
+  size_t tty_rows = tty_chars_buffer.shape[1];
+  size_t tty_columns = tty_chars_buffer.shape[2];
+  size_t row_size = out_buffer.shape[2];
+
+  run_batch(n, num_threads, [&](size_t i) {
+    int16_t *env_glyphs = glyphs_data + i * glyphs_size;
+    int64_t *env_blstats = blstats_data + i * blstats_stride;
+    uint8_t *env_out = out_data + i * 5 * row_size;
+    int64_t *env_lengths = lengths_data + i * 5;
+    env_lengths[0] =
+        write_text(glyphs_to_text(env_glyphs, env_blstats), env_out, row_size);
+    env_lengths[1] =
+        write_text(message_to_text(tty_chars_data + i * tty_rows * tty_columns,
+                                   tty_rows, tty_columns),
+                   env_out + row_size, row_size);
+    env_lengths[2] = write_text(blstats_to_text(env_blstats),
+                                env_out + 2 * row_size, row_size);
+    env_lengths[3] =
+        write_text(inventory_to_text(inv_strs_data + i * inv_rows * inv_columns,
+                                     inv_letters_data + i * inv_letters_stride,
+                                     inv_rows, inv_columns),
+                   env_out + 3 * row_size, row_size);
+    env_lengths[4] =
+        write_text(cursor_to_text(env_glyphs, glyphs_size, env_blstats,
+                                  tty_cursor_data + i * tty_cursor_stride),
+                   env_out + 4 * row_size, row_size);
+  });
 }
 
 }  // namespace nle_language_obsv
 PYBIND11_MODULE(nle_language_obsv, m) {
+  PYBIND11_NUMPY_DTYPE(nle_language_obsv::NLELanguageObsv::StructuredGlyph,
+                       glyph, dx, dy, distance, direction, source);
+  m.attr("distance_names") = distance_names;
+  m.attr("direction_names") = direction_names;
   py::class_<nle_language_obsv::NLELanguageObsv>(m, "NLELanguageObsv")
-      .def(py::init<>())
+      .def(py::init<bool, bool, size_t, size_t>(),
+           "When incremental, text_glyphs & text_all reuse the previous "
+           "step of a single environment, call reset() between episodes. "
+           "When as_str, texts are returned as latin-1 decoded str instead "
+           "of bytes. With cache_entries, the single observation methods "
+           "keep the glyphs, message & blstats texts of up to cache_entries "
+           "recently seen inputs each, within cache_bytes each",
+           py::arg("incremental") = false, py::arg("as_str") = false,
+           py::arg("cache_entries") = 0, py::arg("cache_bytes") = 64 << 20)
+      .def("reset", &nle_language_obsv::NLELanguageObsv::reset,
+           "Forget the previous step of an incremental translator")
+      .def("cache_info", &nle_language_obsv::NLELanguageObsv::cache_info,
+           "Hits & misses of the text_inventory and text_cursor caches, an "
+           "unchanged field returns the same text object. With "
+           "cache_entries also hits, misses, hit_rate, evictions, entries & "
+           "bytes of the text_glyphs, text_message & text_blstats caches")
       .def("text_glyphs", &nle_language_obsv::NLELanguageObsv::text_glyphs,
-           "Convert glyphs to text description")
+           "Convert glyphs to text description. With max_lines or max_chars "
+           "only the lines that fit are kept, monsters & objects first, then "
+           "other features and blocking terrain last, closest first",
+           py::arg("glyphs"), py::arg("blstats"),
+           py::arg("max_lines") = py::none(), py::arg("max_chars") = py::none())
       .def("text_blstats", &nle_language_obsv::NLELanguageObsv::text_blstats,
            "Convert blstats to text description")
       .def("text_inventory",
@@ -1169,5 +2566,78 @@ PYBIND11_MODULE(nle_language_obsv, m) {
       .def("text_cursor", &nle_language_obsv::NLELanguageObsv::text_cursor,
            "Convert tty_cursor to text description")
       .def("text_message", &nle_language_obsv::NLELanguageObsv::text_message,
-           "Convert tty_chars to text message including menus");
+           "Convert tty_chars to text message including menus")
+      .def("text_all", &nle_language_obsv::NLELanguageObsv::text_all,
+           "Convert all observations to text in a single call, returns "
+           "(text_glyphs, text_message, text_blstats, text_inventory, "
+           "text_cursor)")
+      .def("structured_glyphs",
+           &nle_language_obsv::NLELanguageObsv::structured_glyphs,
+           "The glyphs described by text_glyphs as a numpy structured array "
+           "of (glyph, dx, dy, distance, direction, source). dx & dy are "
+           "offsets from the player with dy growing southward, distance & "
+           "direction index distance_names & direction_names and source is "
+           "0 for the fullscreen view and 1 for the visual view",
+           py::arg("glyphs"), py::arg("blstats"))
+      .def("glyph_phrases", &nle_language_obsv::NLELanguageObsv::glyph_phrases,
+           "Every phrase text_glyphs is assembled from, in phrase id order")
+      .def("set_phrase_tokens",
+           &nle_language_obsv::NLELanguageObsv::set_phrase_tokens,
+           "Set the token ids of every phrase of glyph_phrases(), call once "
+           "before token_glyphs",
+           py::arg("phrase_tokens"))
+      .def("token_glyphs", &nle_language_obsv::NLELanguageObsv::token_glyphs,
+           "Write the token ids of text_glyphs into the int32 array "
+           "input_ids, returns the number of tokens which may exceed "
+           "len(input_ids). max_lines & max_tokens keep lines by priority "
+           "as in text_glyphs",
+           py::arg("glyphs"), py::arg("blstats"),
+           py::arg("input_ids").noconvert(), py::arg("max_lines") = py::none(),
+           py::arg("max_tokens") = py::none())
+      .def("text_glyphs_batch",
+           &nle_language_obsv::NLELanguageObsv::text_glyphs_batch,
+           "Convert a batch of glyphs to text descriptions", py::arg("glyphs"),
+           py::arg("blstats"), py::arg("num_threads") = 1,
+           py::arg("max_lines") = py::none(), py::arg("max_chars") = py::none())
+      .def("text_blstats_batch",
+           &nle_language_obsv::NLELanguageObsv::text_blstats_batch,
+           "Convert a batch of blstats to text descriptions",
+           py::arg("blstats"), py::arg("num_threads") = 1)
+      .def("text_inventory_batch",
+           &nle_language_obsv::NLELanguageObsv::text_inventory_batch,
+           "Convert a batch of inventories to text descriptions",
+           py::arg("inv_strs"), py::arg("inv_letters"),
+           py::arg("num_threads") = 1)
+      .def("text_cursor_batch",
+           &nle_language_obsv::NLELanguageObsv::text_cursor_batch,
+           "Convert a batch of tty_cursor to text descriptions",
+           py::arg("glyphs"), py::arg("blstats"), py::arg("tty_cursor"),
+           py::arg("num_threads") = 1)
+      .def("text_message_batch",
+           &nle_language_obsv::NLELanguageObsv::text_message_batch,
+           "Convert a batch of tty_chars to text messages including menus",
+           py::arg("tty_chars"), py::arg("num_threads") = 1)
+      .def("text_all_batch",
+           &nle_language_obsv::NLELanguageObsv::text_all_batch,
+           "Convert a batch of observations to text, returns a list of "
+           "text_all tuples. num_threads <= 0 uses all available cores",
+           py::arg("glyphs"), py::arg("blstats"), py::arg("tty_cursor"),
+           py::arg("inv_strs"), py::arg("inv_letters"), py::arg("tty_chars"),
+           py::arg("num_threads") = 1)
+      .def("text_all_into", &nle_language_obsv::NLELanguageObsv::text_all_into,
+           "Write the text_all texts into the rows of the uint8 array out of "
+           "shape (5, L) and their lengths into the int64 array lengths. "
+           "Texts longer than L are truncated, lengths keeps the untruncated "
+           "length. Bytes past the length of a text are left unchanged",
+           py::arg("glyphs"), py::arg("blstats"), py::arg("tty_cursor"),
+           py::arg("inv_strs"), py::arg("inv_letters"), py::arg("tty_chars"),
+           py::arg("out").noconvert(), py::arg("lengths").noconvert())
+      .def("text_all_batch_into",
+           &nle_language_obsv::NLELanguageObsv::text_all_batch_into,
+           "text_all_into for a batch of observations, out has shape "
+           "(N, 5, L) and lengths (N, 5)",
+           py::arg("glyphs"), py::arg("blstats"), py::arg("tty_cursor"),
+           py::arg("inv_strs"), py::arg("inv_letters"), py::arg("tty_chars"),
+           py::arg("out").noconvert(), py::arg("lengths").noconvert(),
+           py::arg("num_threads") = 1);
 }